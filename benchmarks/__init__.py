@@ -0,0 +1,5 @@
+"""Benchmarks for pyengineio_client, run against a loopback stand-in server:
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --compare results.json
+"""
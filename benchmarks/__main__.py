@@ -0,0 +1,178 @@
+from benchmarks.scenarios import get_scenarios
+from benchmarks.stats import cpu_time, rss_kb, summarize
+from pyengineio_client.util import monotonic
+
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+
+log = logging.getLogger(__name__)
+
+
+def parse_socket_option(value):
+    key, _, raw = value.partition('=')
+
+    try:
+        return key, json.loads(raw)
+    except ValueError:
+        return key, raw
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='pyengineio_client benchmarks')
+
+    parser.add_argument('--url', help='benchmark an existing server (instead of starting the stand-in server)')
+    parser.add_argument('--scenarios', type=lambda v: v.split(','), help='comma-separated scenarios to run')
+    parser.add_argument('--transports', type=lambda v: v.split(','), default=['polling', 'websocket'])
+
+    parser.add_argument('--handshakes', type=int, default=50)
+    parser.add_argument('--upgrades', type=int, default=20)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--window', type=int, default=16, help='messages in flight per socket')
+    parser.add_argument('--sockets', type=int, default=20)
+    parser.add_argument('--messages-per-socket', type=int, default=200)
+    parser.add_argument('--small-size', type=int, default=16)
+    parser.add_argument('--large-size', type=int, default=65536)
+    parser.add_argument('--uri-requests', type=int, default=100000)
+    parser.add_argument('--json-messages', type=int, default=20000)
+    parser.add_argument('--dispatch-packets', type=int, default=100000)
+    parser.add_argument('--json-items', type=int, default=20, help='items per decoded JSON message')
+    parser.add_argument('--timeout', type=float, default=60)
+
+    parser.add_argument(
+        '--socket-option', dest='socket_options', action='append', default=[], type=parse_socket_option,
+        metavar='KEY=JSON', help='extra socket option (e.g. coalesce_delay=5)'
+    )
+
+    parser.add_argument('--output', help='write machine-readable results to this file')
+    parser.add_argument('--compare', help='compare results with a previous results file')
+
+    args = parser.parse_args(argv)
+    args.socket_options = dict(args.socket_options)
+
+    return args
+
+
+def start_server():
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.server'],
+        stdout=subprocess.PIPE
+    )
+
+    url = process.stdout.readline().decode('utf-8').strip()
+
+    if not url:
+        process.kill()
+        raise Exception('stand-in server failed to start')
+
+    return process, url
+
+
+def run_scenario(url, name, params, func):
+    cpu_started = cpu_time()
+    started = monotonic()
+
+    try:
+        result = func(url)
+    except Exception as exc:
+        log.warning('scenario %s %r failed: %s', name, params, exc)
+        return {'name': name, 'params': params, 'error': str(exc)}
+
+    duration = monotonic() - started
+    elapsed = result.get('elapsed', duration)
+
+    return {
+        'name': name,
+        'params': params,
+        'operations': result['operations'],
+        'duration': duration,
+        'throughput': result['operations'] / elapsed if elapsed else None,
+        'latency': summarize(result['latencies']),
+        'cpu': cpu_time() - cpu_started,
+        'rss_kb': rss_kb()
+    }
+
+
+def result_key(result):
+    return '%s %s' % (result['name'], json.dumps(result['params'], sort_keys=True))
+
+
+def format_value(value, fmt='%.2f'):
+    return fmt % value if value is not None else '-'
+
+
+def print_results(results, baseline=None):
+    baseline = dict((result_key(r), r) for r in (baseline or {}).get('results', []))
+
+    for result in results:
+        line = '%-16s %-40s' % (result['name'], json.dumps(result['params'], sort_keys=True))
+
+        if 'error' in result:
+            print('%s  error: %s' % (line, result['error']))
+            continue
+
+        line += '  %10s ops/s  p50 %8s ms  p99 %8s ms  cpu %6.2fs  rss %s KB' % (
+            format_value(result['throughput']),
+            format_value(result['latency']['p50'], '%.3f'),
+            format_value(result['latency']['p99'], '%.3f'),
+            result['cpu'], result['rss_kb']
+        )
+
+        previous = baseline.get(result_key(result))
+
+        if previous and previous.get('throughput') and result['throughput']:
+            line += '  (throughput %+.1f%%)' % (100.0 * (result['throughput'] / previous['throughput'] - 1))
+
+        print(line)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.WARNING)
+
+    args = parse_args(argv)
+
+    process = None
+    url = args.url
+
+    if not url:
+        process, url = start_server()
+
+    try:
+        results = [
+            run_scenario(url, name, params, func)
+            for name, params, func in get_scenarios(args)
+        ]
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    report = {
+        'meta': {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'socket_options': args.socket_options
+        },
+        'results': results
+    }
+
+    baseline = None
+
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,341 @@
+from pyengineio_client.codec import CODECS
+from pyengineio_client.compat import PY2
+from pyengineio_client.emitter import FastEmitter
+from pyengineio_client.socket import Socket
+from pyengineio_client.transports.polling import Polling
+from pyengineio_client.util import monotonic
+
+from pyemitter import Emitter
+from threading import Event, Lock
+import struct
+
+
+class EchoClient(object):
+    def __init__(self, url, opts, size=16, binary=False):
+        """Drives a `Socket` against the echo server, recording the round-trip
+           time of every message.
+
+        :param url: server url
+        :type url: str
+
+        :param opts: socket options
+        :type opts: dict
+
+        :param size: message size in bytes
+        :type size: int
+
+        :param binary: send binary messages (instead of strings)
+        :type binary: bool
+        """
+        self.size = max(size, 4)
+        self.binary = binary
+
+        self.lock = Lock()
+
+        self.opened = Event()
+        self.done = Event()
+
+        self.count = 0
+        self.next_seq = 0
+        self.received = 0
+
+        self.sent = {}
+        self.latencies = []
+
+        self.socket = Socket(url, dict(opts))
+        self.socket.on('open', self.opened.set)
+        self.socket.on('message', self.on_message)
+        self.socket.on('close', lambda *args: self.done.set())
+
+    def message(self, seq):
+        if self.binary:
+            return bytearray(struct.pack('!I', seq)) + bytearray(self.size - 4)
+
+        prefix = '%d:' % seq
+        return prefix + 'x' * max(self.size - len(prefix), 0)
+
+    def parse(self, data):
+        if isinstance(data, (bytearray, memoryview)) or (not PY2 and isinstance(data, bytes)):
+            return struct.unpack('!I', bytes(data[:4]))[0]
+
+        return int(data.split(':', 1)[0])
+
+    def start(self, count, window):
+        """Sends `count` messages keeping up to `window` messages in flight."""
+        self.count = count
+
+        for _ in range(min(window, count)):
+            self.send_next()
+
+    def send_next(self):
+        with self.lock:
+            if self.next_seq >= self.count:
+                return
+
+            seq = self.next_seq
+            self.next_seq += 1
+
+            self.sent[seq] = monotonic()
+
+        self.socket.write(self.message(seq))
+
+    def on_message(self, data):
+        now = monotonic()
+
+        with self.lock:
+            sent = self.sent.pop(self.parse(data), None)
+
+            if sent is not None:
+                self.latencies.append(now - sent)
+
+            self.received += 1
+            finished = self.received >= self.count
+
+        if finished:
+            self.done.set()
+        else:
+            self.send_next()
+
+    def close(self):
+        self.socket.close()
+
+
+def socket_options(transport, args, **kwargs):
+    opts = {
+        'transports': [transport],
+        'upgrade': False
+    }
+
+    opts.update(args.socket_options)
+    opts.update(kwargs)
+
+    return opts
+
+
+def handshake(url, args, transport):
+    """Opens sockets one after another, measuring the time until `open`."""
+    latencies = []
+
+    for _ in range(args.handshakes):
+        started = monotonic()
+
+        client = EchoClient(url, socket_options(transport, args))
+
+        if client.opened.wait(args.timeout):
+            latencies.append(monotonic() - started)
+
+        client.close()
+
+    return {
+        'operations': len(latencies),
+        'latencies': latencies
+    }
+
+
+def messages(url, args, transport, size, binary=False, force_base64=False):
+    """Sends messages over a single socket, measuring echo round-trip times."""
+    client = EchoClient(url, socket_options(transport, args, force_base64=force_base64), size, binary)
+
+    if not client.opened.wait(args.timeout):
+        client.close()
+        raise Exception('socket did not open')
+
+    started = monotonic()
+
+    client.start(args.messages, args.window)
+    client.done.wait(args.timeout)
+
+    elapsed = monotonic() - started
+    client.close()
+
+    return {
+        'operations': client.received,
+        'elapsed': elapsed,
+        'latencies': client.latencies
+    }
+
+
+def upgrade(url, args, transport='websocket'):
+    """Opens sockets over polling, measuring the time until the websocket upgrade."""
+    latencies = []
+
+    for _ in range(args.upgrades):
+        upgraded = Event()
+        started = monotonic()
+
+        opts = socket_options('polling', args, transports=['polling', transport], upgrade=True)
+
+        socket = Socket(url, opts)
+        socket.on('upgrade', lambda *a: upgraded.set())
+
+        if upgraded.wait(args.timeout):
+            latencies.append(monotonic() - started)
+
+        socket.close()
+
+    return {
+        'operations': len(latencies),
+        'latencies': latencies
+    }
+
+
+def concurrent(url, args, transport):
+    """Sends messages over many sockets at once."""
+    clients = [EchoClient(url, socket_options(transport, args)) for _ in range(args.sockets)]
+
+    for client in clients:
+        if not client.opened.wait(args.timeout):
+            raise Exception('socket did not open')
+
+    started = monotonic()
+
+    for client in clients:
+        client.start(args.messages_per_socket, args.window)
+
+    for client in clients:
+        client.done.wait(args.timeout)
+
+    elapsed = monotonic() - started
+
+    latencies = []
+
+    for client in clients:
+        latencies.extend(client.latencies)
+        client.close()
+
+    return {
+        'operations': len(latencies),
+        'elapsed': elapsed,
+        'latencies': latencies
+    }
+
+
+def uri(url, args, cached=True):
+    """Builds polling request uris, measuring the cost per request
+       (`cached=False` rebuilds the whole uri every request)."""
+    transport = Polling({
+        'hostname': 'localhost',
+        'port': 8080,
+        'secure': False,
+        'path': '/engine.io/',
+        'query': {'EIO': '3', 'transport': 'polling', 'sid': 'x' * 20},
+        'timestamp_param': 't',
+        'timestamp_requests': True,
+        'agent': False,
+        'socket': None
+    })
+
+    latencies = []
+    started = monotonic()
+
+    for _ in range(args.uri_requests):
+        if not cached:
+            transport.uri_base = None
+
+        request_started = monotonic()
+        transport.uri()
+        latencies.append(monotonic() - request_started)
+
+    return {
+        'operations': len(latencies),
+        'elapsed': monotonic() - started,
+        'latencies': latencies
+    }
+
+
+def json_decode(url, args, codec):
+    """Decodes a JSON message with the given backend, measuring the cost per message."""
+    codec = CODECS[codec]
+
+    message = codec.dumps({
+        'event': 'update',
+        'id': 12345,
+        'values': [{'key': 'item-%d' % i, 'value': i * 1.5, 'active': i % 2 == 0} for i in range(args.json_items)]
+    })
+
+    latencies = []
+    started = monotonic()
+
+    for _ in range(args.json_messages):
+        decode_started = monotonic()
+        codec.loads(message)
+        latencies.append(monotonic() - decode_started)
+
+    return {
+        'operations': len(latencies),
+        'elapsed': monotonic() - started,
+        'latencies': latencies
+    }
+
+
+def dispatch(url, args, emitter):
+    """Emits the events of a received message packet ('packet', 'heartbeat',
+       'data' and 'message' with a single 'message' listener), measuring the
+       cost per packet."""
+    emitter = FastEmitter() if emitter == 'fast' else Emitter()
+    emitter.on('message', lambda data: None)
+
+    packet = {'type': 'message', 'data': 'x' * args.small_size}
+
+    latencies = []
+    started = monotonic()
+
+    for _ in range(args.dispatch_packets):
+        dispatch_started = monotonic()
+
+        emitter.emit('packet', packet)
+        emitter.emit('heartbeat')
+        emitter.emit('data', packet['data'])
+        emitter.emit('message', packet['data'])
+
+        latencies.append(monotonic() - dispatch_started)
+
+    return {
+        'operations': len(latencies),
+        'elapsed': monotonic() - started,
+        'latencies': latencies
+    }
+
+
+def get_scenarios(args):
+    """Returns `(name, params, function)` for every scenario to run.
+
+    :rtype: list
+    """
+    scenarios = []
+
+    for transport in args.transports:
+        scenarios.extend([
+            ('handshake', {'transport': transport}, lambda url, t=transport: handshake(url, args, t)),
+            ('messages_small', {'transport': transport, 'size': args.small_size},
+             lambda url, t=transport: messages(url, args, t, args.small_size)),
+            ('messages_large', {'transport': transport, 'size': args.large_size},
+             lambda url, t=transport: messages(url, args, t, args.large_size)),
+            ('binary', {'transport': transport, 'size': args.large_size},
+             lambda url, t=transport: messages(url, args, t, args.large_size, binary=True)),
+            ('binary_base64', {'transport': transport, 'size': args.large_size},
+             lambda url, t=transport: messages(url, args, t, args.large_size, binary=True, force_base64=True)),
+            ('concurrent', {'transport': transport, 'sockets': args.sockets},
+             lambda url, t=transport: concurrent(url, args, t))
+        ])
+
+    if 'websocket' in args.transports:
+        scenarios.append(('upgrade', {'transport': 'websocket'}, lambda url: upgrade(url, args)))
+
+    scenarios.extend([
+        ('uri', {'cached': True}, lambda url: uri(url, args)),
+        ('uri', {'cached': False}, lambda url: uri(url, args, cached=False))
+    ])
+
+    for emitter in ['pyemitter', 'fast']:
+        scenarios.append(('dispatch', {'emitter': emitter},
+                          lambda url, e=emitter: dispatch(url, args, e)))
+
+    for codec in sorted(CODECS):
+        scenarios.append(('json', {'codec': codec, 'items': args.json_items},
+                          lambda url, c=codec: json_decode(url, args, c)))
+
+    if args.scenarios:
+        scenarios = [s for s in scenarios if s[0] in args.scenarios]
+
+    return scenarios
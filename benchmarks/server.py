@@ -0,0 +1,403 @@
+"""Loopback engine.io (protocol 3) stand-in server used by the benchmarks.
+
+Supports the polling and websocket transports (including upgrades) and
+echoes every `message` packet back to the client, run with:
+
+    python -m benchmarks.server --port 8000
+"""
+from pyengineio_client.compat import PY2
+
+from threading import Lock
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import pyengineio_parser as parser
+import struct
+import sys
+import uuid
+
+if PY2:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from Queue import Empty, Queue
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qsl
+else:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from queue import Empty, Queue
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qsl
+
+log = logging.getLogger(__name__)
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OPCODE_CONT = 0x0
+OPCODE_TEXT = 0x1
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+
+def unmask(payload, mask):
+    """Applies a websocket masking key to `payload`."""
+    length = len(payload)
+
+    if not length:
+        return payload
+
+    key = (mask * (length // 4 + 1))[:length]
+
+    if PY2:
+        return bytearray(a ^ b for a, b in zip(payload, key))
+
+    value = int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')
+    return bytearray(value.to_bytes(length, 'big'))
+
+
+class WebSocketConnection(object):
+    def __init__(self, rfile, wfile):
+        """Server side of a websocket connection (frames from the client are masked)."""
+        self.rfile = rfile
+        self.wfile = wfile
+
+        self.lock = Lock()
+
+    def read_message(self):
+        """Reads the next data message, answering control frames.
+
+        :return: `(opcode, payload)` or `None` when the connection closed
+        """
+        message = None
+        message_opcode = None
+
+        while True:
+            head = self.rfile.read(2)
+
+            if len(head) < 2:
+                return None
+
+            b1, b2 = bytearray(head)
+
+            fin = b1 & 0x80
+            opcode = b1 & 0x0F
+            length = b2 & 0x7F
+
+            if length == 126:
+                length = struct.unpack('!H', self.rfile.read(2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', self.rfile.read(8))[0]
+
+            mask = bytearray(self.rfile.read(4)) if b2 & 0x80 else None
+            payload = bytearray(self.rfile.read(length))
+
+            if mask:
+                payload = unmask(payload, mask)
+
+            if opcode == OPCODE_CLOSE:
+                self.send_frame(OPCODE_CLOSE, bytes(payload[:2]))
+                return None
+
+            if opcode == OPCODE_PING:
+                self.send_frame(OPCODE_PONG, bytes(payload))
+                continue
+
+            if opcode == OPCODE_PONG:
+                continue
+
+            if opcode != OPCODE_CONT:
+                message = payload
+                message_opcode = opcode
+            else:
+                message += payload
+
+            if fin:
+                return message_opcode, message
+
+    def send_frame(self, opcode, data):
+        length = len(data)
+
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, length)
+        elif length < 65536:
+            header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+
+        with self.lock:
+            self.wfile.write(header + data)
+            self.wfile.flush()
+
+    def send_packet(self, packet, supports_binary):
+        encoded = []
+        parser.encode_packet(packet, encoded.append, supports_binary)
+
+        data = encoded[0]
+
+        if isinstance(data, bytearray) or (not PY2 and isinstance(data, bytes)):
+            self.send_frame(OPCODE_BINARY, bytes(data))
+        else:
+            if not PY2:
+                data = data.encode('utf-8')
+
+            self.send_frame(OPCODE_TEXT, data)
+
+
+class Session(object):
+    def __init__(self, server, supports_binary):
+        self.server = server
+        self.sid = uuid.uuid4().hex
+
+        self.supports_binary = supports_binary
+
+        # packets waiting for the next poll (until upgraded)
+        self.queue = Queue()
+        self.ws = None
+
+        self.closed = False
+
+    def send(self, packet):
+        ws = self.ws
+
+        if ws is not None:
+            ws.send_packet(packet, self.supports_binary)
+        else:
+            self.queue.put(packet)
+
+    def poll(self, timeout):
+        try:
+            packets = [self.queue.get(timeout=timeout)]
+        except Empty:
+            return [{'type': 'noop'}]
+
+        while True:
+            try:
+                packets.append(self.queue.get_nowait())
+            except Empty:
+                return packets
+
+    def on_packet(self, packet):
+        p_type = packet.get('type')
+
+        if p_type == 'ping':
+            self.send({'type': 'pong', 'data': packet.get('data')})
+        elif p_type == 'message':
+            # echo messages back to the client
+            self.send({'type': 'message', 'data': packet.get('data')})
+        elif p_type == 'close':
+            self.close()
+
+    def close(self):
+        self.closed = True
+        self.server.sessions.pop(self.sid, None)
+
+        # release a pending poll
+        self.queue.put({'type': 'noop'})
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # headers and body are written separately, avoid delayed ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        log.debug(format, *args)
+
+    def parse_request_query(self):
+        _, _, qs = self.path.partition('?')
+        return dict(parse_qsl(qs))
+
+    def do_GET(self):
+        query = self.parse_request_query()
+
+        if query.get('transport') == 'websocket':
+            return self.handle_websocket(query)
+
+        sid = query.get('sid')
+
+        if not sid:
+            session = self.server.create_session(query)
+            return self.send_payload(session, [self.server.handshake_packet(session, ['websocket'])])
+
+        session = self.server.sessions.get(sid)
+
+        if session is None:
+            return self.send_error_response(400, 'Session ID unknown')
+
+        self.send_payload(session, session.poll(self.server.ping_interval / 1000.0))
+
+    def do_POST(self):
+        query = self.parse_request_query()
+        session = self.server.sessions.get(query.get('sid'))
+
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        if session is None:
+            return self.send_error_response(400, 'Session ID unknown')
+
+        packets = []
+        parser.decode_payload(bytearray(body), lambda packet, index, total: packets.append(packet))
+
+        for packet in packets:
+            session.on_packet(packet)
+
+        self.send_body(b'ok', 'text/html')
+
+    def send_payload(self, session, packets):
+        encoded = []
+        parser.encode_payload(packets, encoded.append, session.supports_binary)
+
+        data = encoded[0]
+
+        if isinstance(data, bytearray) or (not PY2 and isinstance(data, bytes)):
+            self.send_body(bytes(data), 'application/octet-stream')
+        else:
+            self.send_body(data.encode('utf-8') if not PY2 else data, 'text/plain; charset=UTF-8')
+
+    def send_body(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        self.wfile.write(body)
+
+    def send_error_response(self, code, message):
+        body = json.dumps({'code': code, 'message': message}).encode('utf-8')
+
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        self.wfile.write(body)
+
+    def handle_websocket(self, query):
+        key = self.headers.get('Sec-WebSocket-Key')
+
+        if not key:
+            return self.send_error_response(400, 'Bad handshake')
+
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode('ascii')).digest())
+
+        self.send_response(101)
+        self.send_header('Upgrade', 'websocket')
+        self.send_header('Connection', 'Upgrade')
+        self.send_header('Sec-WebSocket-Accept', accept.decode('ascii'))
+        self.end_headers()
+        self.wfile.flush()
+
+        ws = WebSocketConnection(self.rfile, self.wfile)
+        session = self.server.sessions.get(query.get('sid'))
+
+        if session is None:
+            # websocket-only connection
+            session = self.server.create_session(query)
+            session.ws = ws
+
+            ws.send_packet(self.server.handshake_packet(session, []), session.supports_binary)
+
+        while not session.closed:
+            message = ws.read_message()
+
+            if message is None:
+                break
+
+            opcode, payload = message
+
+            if opcode == OPCODE_TEXT:
+                payload = payload.decode('utf-8') if not PY2 else str(payload)
+
+            packet = parser.decode_packet(payload)
+
+            if packet.get('type') == 'ping' and packet.get('data') == 'probe':
+                ws.send_packet({'type': 'pong', 'data': 'probe'}, session.supports_binary)
+
+                # release the pending poll so the client can pause polling
+                session.queue.put({'type': 'noop'})
+                continue
+
+            if packet.get('type') == 'upgrade':
+                session.ws = ws
+
+                # flush packets buffered for polling
+                for queued in session.poll(0):
+                    if queued.get('type') != 'noop':
+                        ws.send_packet(queued, session.supports_binary)
+
+                continue
+
+            session.on_packet(packet)
+
+        if session.ws is ws:
+            session.close()
+
+        self.close_connection = True
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=('127.0.0.1', 0), ping_interval=25000, ping_timeout=60000):
+        """Threaded engine.io stand-in server.
+
+        :param address: `(host, port)` to listen on, port 0 picks a free port
+        :type address: tuple
+        """
+        HTTPServer.__init__(self, address, RequestHandler)
+
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+
+        self.sessions = {}
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://%s:%s' % (host, port)
+
+    def create_session(self, query):
+        session = Session(self, supports_binary=not query.get('b64'))
+        self.sessions[session.sid] = session
+
+        return session
+
+    def handshake_packet(self, session, upgrades):
+        return {
+            'type': 'open',
+            'data': json.dumps({
+                'sid': session.sid,
+                'upgrades': upgrades,
+                'pingInterval': self.ping_interval,
+                'pingTimeout': self.ping_timeout
+            })
+        }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='engine.io stand-in server')
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=0)
+    arg_parser.add_argument('--ping-interval', type=int, default=25000)
+    arg_parser.add_argument('--ping-timeout', type=int, default=60000)
+
+    args = arg_parser.parse_args(argv)
+
+    server = StandInServer((args.host, args.port), args.ping_interval, args.ping_timeout)
+
+    # the benchmark runner reads the address from the first line
+    sys.stdout.write(server.url + '\n')
+    sys.stdout.flush()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
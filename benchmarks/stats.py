@@ -0,0 +1,65 @@
+import os
+
+try:
+    import resource
+except ImportError:
+    # not available on windows
+    resource = None
+
+
+def percentile(values, percent):
+    """Returns the `percent` percentile of `values` (nearest-rank).
+
+    :type values: list
+    :type percent: float
+    """
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    index = int(round(percent / 100.0 * (len(ordered) - 1)))
+
+    return ordered[index]
+
+
+def summarize(values):
+    """Summarizes latencies (in seconds) as milliseconds.
+
+    :rtype: dict
+    """
+    if not values:
+        return {'count': 0, 'mean': None, 'p50': None, 'p99': None, 'max': None}
+
+    return {
+        'count': len(values),
+        'mean': 1000.0 * sum(values) / len(values),
+        'p50': 1000.0 * percentile(values, 50),
+        'p99': 1000.0 * percentile(values, 99),
+        'max': 1000.0 * max(values)
+    }
+
+
+def cpu_time():
+    """Returns user + system CPU seconds used by this process."""
+    if resource is None:
+        return os.times()[0] + os.times()[1]
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def rss_kb():
+    """Returns the current resident set size in kilobytes (peak RSS where
+       the current value isn't available)."""
+    try:
+        with open('/proc/self/statm') as fp:
+            pages = int(fp.read().split()[1])
+
+        return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (IOError, OSError, ValueError):
+        pass
+
+    if resource is None:
+        return None
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
@@ -1,4 +1,8 @@
+from pyengineio_client.capabilities import CapabilityCache
+from pyengineio_client.metrics import Metrics
+from pyengineio_client.pool import SocketPool
 from pyengineio_client.socket import Socket
+from pyengineio_client.tracing import Tracer
 
 
 def connect(uri, opts=None):
@@ -0,0 +1,9 @@
+"""asyncio client (requires Python 3.5+ and aiohttp)."""
+from pyengineio_client.aio.socket import AsyncSocket
+
+
+def connect(uri, opts=None):
+    if opts is None:
+        opts = {}
+
+    return AsyncSocket(uri, opts)
@@ -0,0 +1,81 @@
+class LoopTimer(object):
+    def __init__(self, loop, delay, callback):
+        """Timer handle driven by an asyncio event loop, mirrors
+           `pyengineio_client.scheduler.ScheduledTimer`.
+
+        :param loop: event loop
+        :type loop: asyncio.AbstractEventLoop
+
+        :param delay: seconds until the callback is due
+        :type delay: float
+
+        :param callback: function to call when the deadline passes
+        :type callback: function
+        """
+        self.loop = loop
+        self.callback = callback
+
+        self.deadline = loop.time() + delay
+        self.handle = loop.call_at(self.deadline, self.fire)
+
+        self.cancelled = False
+        self.fired = False
+
+    @property
+    def active(self):
+        return not (self.cancelled or self.fired)
+
+    def fire(self):
+        if self.cancelled:
+            return
+
+        if self.loop.time() < self.deadline:
+            # deadline was pushed back, re-arm
+            self.handle = self.loop.call_at(self.deadline, self.fire)
+            return
+
+        self.handle = None
+        self.fired = True
+        self.callback()
+
+    def reset(self, delay):
+        """Moves the deadline to `delay` seconds from now."""
+        deadline = self.loop.time() + delay
+
+        if self.handle is None or deadline < self.deadline:
+            if self.handle:
+                self.handle.cancel()
+
+            self.handle = self.loop.call_at(deadline, self.fire)
+
+        self.deadline = deadline
+        self.cancelled = False
+        self.fired = False
+        return self
+
+    def cancel(self):
+        """Cancels the timer, the callback will not be called."""
+        self.cancelled = True
+
+        if self.handle:
+            self.handle.cancel()
+            self.handle = None
+
+        return self
+
+
+class LoopScheduler(object):
+    def __init__(self, loop):
+        """Scheduler that runs timers on an asyncio event loop.
+
+        :param loop: event loop
+        :type loop: asyncio.AbstractEventLoop
+        """
+        self.loop = loop
+
+    def schedule(self, delay, callback):
+        """Calls `callback` in `delay` seconds.
+
+        :rtype: LoopTimer
+        """
+        return LoopTimer(self.loop, delay, callback)
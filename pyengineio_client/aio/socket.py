@@ -0,0 +1,152 @@
+from pyengineio_client.aio.scheduler import LoopScheduler
+from pyengineio_client.aio.transports import ASYNC_TRANSPORTS
+from pyengineio_client.exceptions import ReceiveQueueClosed, ReceiveTimeout
+from pyengineio_client.socket import Socket
+
+import aiohttp
+import asyncio
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class AsyncSocket(Socket):
+    transport_classes = ASYNC_TRANSPORTS
+
+    def __init__(self, uri, opts=None):
+        """Socket running on an asyncio event loop, transports and ping timers
+           are driven by the loop so no threads are created per connection.
+
+        :param uri: uri
+        :type uri: str
+
+        :param opts: options (`loop` - event loop, `session` - shared aiohttp.ClientSession)
+        :type opts: dict
+        """
+        opts = opts or {}
+
+        self.loop = opts.get('loop') or asyncio.get_event_loop()
+
+        self.session = opts.get('session')
+        self.session_owned = self.session is None
+
+        # request tasks in flight, by session
+        self.requests = {}
+
+        if not opts.get('scheduler'):
+            opts['scheduler'] = LoopScheduler(self.loop)
+
+        # the loop can't wait for queue space
+        if opts.get('receive_queue') and opts.get('receive_policy') == 'block':
+            raise ValueError('"block" receive policy is not supported by AsyncSocket')
+
+        super(AsyncSocket, self).__init__(uri, opts)
+
+        # futures resolved when a message is queued (one per waiting `recv()`)
+        self.receive_waiters = []
+
+        if self.receive_queue is not None:
+            self.receive_queue.listener = self.on_receive
+
+    def get_session(self):
+        """Returns the HTTP session used by transports, created on first use.
+
+        :rtype: aiohttp.ClientSession
+        """
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+
+        return self.session
+
+    def track(self, session, task):
+        """Tracks a request task, owned sessions are closed once their requests complete."""
+        tasks = self.requests.setdefault(session, set())
+
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def close_session(self, session):
+        # let requests in flight (e.g. the close packet) complete first
+        tasks = self.requests.get(session)
+
+        while tasks:
+            await asyncio.wait(list(tasks))
+
+        self.requests.pop(session, None)
+
+        await session.close()
+
+    def wait(self, event):
+        """Returns a future resolved with the arguments of the next `event` emit.
+
+        :param event: event name
+        :type event: str
+
+        :rtype: asyncio.Future
+        """
+        future = self.loop.create_future()
+
+        @self.once(event)
+        def resolve(*args):
+            if not future.done():
+                future.set_result(args)
+
+        return future
+
+    def wait_writable(self):
+        """Returns a future resolved once the write buffer is back down
+           to the low watermarks.
+
+        :rtype: asyncio.Future
+        """
+        if not self.buffer_high:
+            future = self.loop.create_future()
+            future.set_result(True)
+            return future
+
+        return self.wait('bufferLow')
+
+    def on_receive(self):
+        waiters, self.receive_waiters = self.receive_waiters, []
+
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def recv(self):
+        """Returns the next received message (requires the `receive_queue` option).
+
+        :raises ReceiveQueueClosed: the socket is closed and all messages have been received
+        """
+        if self.receive_queue is None:
+            raise Exception('Receive queue not enabled')
+
+        while True:
+            try:
+                return self.receive_queue.get(block=False)
+            except ReceiveTimeout:
+                pass
+
+            waiter = self.loop.create_future()
+            self.receive_waiters.append(waiter)
+
+            await waiter
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.recv()
+        except ReceiveQueueClosed:
+            raise StopAsyncIteration
+
+    def on_close(self, reason=None, desc=None):
+        if self.ready_state not in ['opening', 'open']:
+            return
+
+        super(AsyncSocket, self).on_close(reason, desc)
+
+        if self.session_owned and self.session is not None:
+            session, self.session = self.session, None
+            self.loop.create_task(self.close_session(session))
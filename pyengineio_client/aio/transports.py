@@ -0,0 +1,209 @@
+from pyengineio_client.payload import PayloadDecoder
+from pyengineio_client.transports.polling import Polling
+from pyengineio_client.transports.ws import WebSocket
+from pyengineio_client.util import monotonic
+
+import aiohttp
+import asyncio
+import logging
+import pyengineio_parser as parser
+
+log = logging.getLogger(__name__)
+
+
+class AsyncPolling(Polling):
+    def __init__(self, opts):
+        """Polling transport running on an asyncio event loop.
+
+        :type opts: dict
+        """
+        super(AsyncPolling, self).__init__(opts)
+
+        self.loop = self.socket.loop
+
+        # bound on creation, requests made while closing (e.g. the close
+        # packet) must not create a new session after the socket released it
+        self.session = self.socket.get_session()
+
+    def request(self, data=None, method='GET', callback=None):
+        if method not in ['GET', 'POST']:
+            self.on_error('Unknown method specified')
+            return
+
+        if self.session.closed:
+            log.debug('session closed - ignoring %s request', method)
+            return
+
+        self.socket.track(self.session, self.loop.create_task(self.do_request(data, method, callback)))
+
+    async def do_request(self, data, method, callback):
+        headers = None
+        started = monotonic() if self.metrics else None
+
+        if method == 'POST':
+            # Important for binary requests
+            headers = {'Content-Type': 'application/octet-stream'}
+
+        try:
+            async with self.session.request(method, self.uri(), data=data, headers=headers) as response:
+                if started is not None:
+                    # streamed polls are timed until the response headers arrive
+                    self.metrics.observe(
+                        'poll_seconds' if method == 'GET' else 'write_seconds',
+                        monotonic() - started, transport=self.name
+                    )
+
+                if response.status != 200:
+                    self.on_error('request returned with status code %s' % response.status)
+                    return
+
+                if method == 'GET' and self.stream_polls:
+                    await self.on_stream(response)
+                    return
+
+                content = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            self.on_error(str(exc))
+            return
+
+        if not callback:
+            return
+
+        if self.binary_views:
+            callback(memoryview(content))
+        else:
+            callback(bytearray(content))
+
+    async def on_stream(self, response):
+        """Decodes a streamed poll response, dispatching packets as they arrive."""
+        decoder = PayloadDecoder(self.on_payload_packet)
+
+        async for chunk in response.content.iter_chunked(self.stream_chunk_size):
+            decoder.feed(chunk)
+
+            if self.ready_state == 'closed':
+                return
+
+        decoder.close()
+
+        self.on_poll_complete()
+
+    def do_write(self, data, callback):
+        """Sends data.
+
+        :param data: data to send
+        :type data: str
+
+        :param callback: called upon flush
+        :type callback: function
+        """
+        self.request(
+            data=data,
+            method='POST',
+            callback=callback
+        )
+
+    def do_poll(self):
+        log.debug('async poll')
+        self.request(callback=self.on_data)
+
+
+class AsyncWebSocket(WebSocket):
+    def __init__(self, opts):
+        """WebSocket transport running on an asyncio event loop.
+
+        :type opts: dict
+        """
+        super(AsyncWebSocket, self).__init__(opts)
+
+        self.loop = self.socket.loop
+
+        # bound on creation (see `AsyncPolling`)
+        self.session = self.socket.get_session()
+
+        self.task = None
+        self.send_lock = asyncio.Lock()
+
+    def do_open(self):
+        """Opens socket."""
+        self.task = self.loop.create_task(self.run())
+
+    async def run(self):
+        try:
+            self.ws = await self.session.ws_connect(self.uri(), compress=self.compress_bits())
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            self.on_error(str(exc))
+            return
+
+        self.on_open()
+
+        async for message in self.ws:
+            if message.type == aiohttp.WSMsgType.TEXT:
+                self.on_data(message.data)
+            elif message.type == aiohttp.WSMsgType.BINARY:
+                self.on_data(memoryview(message.data) if self.binary_views else bytearray(message.data))
+            elif message.type == aiohttp.WSMsgType.ERROR:
+                self.on_error(str(self.ws.exception()))
+                return
+
+        if self.ready_state != 'closed':
+            self.on_close()
+
+    def compress_bits(self):
+        """Returns the permessage-deflate window bits offered to the server (`0` disables
+           compression), aiohttp doesn't support the `level` and `threshold` options.
+
+        :rtype: int
+        """
+        if not self.compression:
+            return 0
+
+        options = self.compression if isinstance(self.compression, dict) else {}
+
+        return min(max(options.get('window_bits', 15), 9), 15)
+
+    def do_close(self):
+        if self.ws:
+            self.loop.create_task(self.ws.close())
+        elif self.task:
+            self.task.cancel()
+
+    def write(self, packets):
+        self.writable = False
+
+        frames = []
+
+        # encodePacket efficient as it uses WS framing
+        # no need for encodePayload
+        span = self.tracer.span('encode', transport=self.name, packets=len(packets)) if self.tracer else None
+
+        try:
+            for packet in packets:
+                parser.encode_packet(packet, frames.append, self.supports_binary)
+        finally:
+            if span:
+                span.finish()
+
+        self.loop.create_task(self.do_write(frames))
+
+    async def do_write(self, frames):
+        # serialize writes so frames from separate flushes can't interleave
+        async with self.send_lock:
+            try:
+                for data in frames:
+                    if isinstance(data, (bytes, bytearray)):
+                        await self.ws.send_bytes(bytes(data))
+                    else:
+                        await self.ws.send_str(data)
+            except (aiohttp.ClientError, ConnectionError) as exc:
+                self.on_error(str(exc))
+                return
+
+        self.writable = True
+        self.emit('drain')
+
+
+ASYNC_TRANSPORTS = {
+    'polling': AsyncPolling,
+    'websocket': AsyncWebSocket
+}
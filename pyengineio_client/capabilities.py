@@ -0,0 +1,183 @@
+from threading import Lock
+import json
+import logging
+import os
+import tempfile
+import time
+
+log = logging.getLogger(__name__)
+
+
+class CapabilityCache(object):
+    # values that change on every connection, updating them doesn't persist the cache
+    volatile = ('handshake_ms',)
+
+    def __init__(self, path=None, ttl=86400):
+        """Per-host record of transport capabilities (websocket support,
+           binary support and handshake latency).
+
+        Pass a `CapabilityCache` as the `capability_cache` socket option
+        (or `True` to use the process-wide cache), sockets connect straight
+        to websocket for hosts where it is known to work.
+
+        :param path: file the cache is persisted to (or `None` to keep it in memory)
+        :type path: str
+
+        :param ttl: seconds an entry is valid for after it was last updated
+        :type ttl: int
+        """
+        self.path = path
+        self.ttl = ttl
+
+        self.entries = {}
+        self.lock = Lock()
+
+        # serializes saves, so the last save writes the latest entries
+        self.save_lock = Lock()
+
+        if self.path:
+            self.load()
+
+    @staticmethod
+    def key(hostname, port, secure):
+        return '%s://%s:%s' % ('https' if secure else 'http', hostname, port)
+
+    def get(self, key):
+        """Returns the entry for `key`, or `None` if there is no valid entry.
+
+        :rtype: dict
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                return None
+
+            if time.time() - entry['updated'] > self.ttl:
+                del self.entries[key]
+                return None
+
+            return dict(entry)
+
+    def websocket_supported(self, key):
+        """Checks if websocket is known to work for `key`.
+
+        :rtype: bool
+        """
+        entry = self.get(key)
+
+        return bool(entry and entry.get('websocket'))
+
+    def update(self, key, **values):
+        """Updates the entry for `key`, the cache is persisted if the
+           entry is new or its values changed.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            changed = entry is None or any(
+                entry.get(name) != value
+                for name, value in values.items()
+                if name not in self.volatile
+            )
+
+            if entry is None:
+                entry = self.entries[key] = {}
+
+            entry.update(values)
+            entry['updated'] = time.time()
+
+        if changed and self.path:
+            self.save()
+
+    def record_handshake(self, key, latency, transport, binary):
+        """Records a completed handshake.
+
+        :param latency: handshake latency (in ms)
+        :type latency: float
+
+        :param transport: name of the transport the handshake was received on
+        :type transport: str
+
+        :param binary: binary support of the transport
+        :type binary: bool
+        """
+        entry = self.get(key) or {}
+
+        if entry.get('handshake_ms') is not None:
+            # smoothed to avoid jumping on a single slow handshake
+            latency = 0.75 * entry['handshake_ms'] + 0.25 * latency
+
+        values = {
+            'handshake_ms': round(latency, 1),
+            'binary': binary
+        }
+
+        if transport == 'websocket':
+            values['websocket'] = True
+
+        self.update(key, **values)
+
+    def load(self):
+        """Loads entries from `path`, missing or invalid files are ignored."""
+        try:
+            with open(self.path, 'r') as fp:
+                entries = json.load(fp)
+        except (IOError, OSError, ValueError) as exc:
+            log.debug('unable to load capability cache from "%s": %s', self.path, exc)
+            return
+
+        if not isinstance(entries, dict):
+            return
+
+        with self.lock:
+            self.entries.update(entries)
+
+    def save(self):
+        """Writes entries to `path` (replacing the file atomically where supported)."""
+        with self.save_lock:
+            with self.lock:
+                data = json.dumps(self.entries)
+
+            temp_path = None
+
+            try:
+                # unique temporary file in the target directory (so it can be renamed over `path`)
+                fd, temp_path = tempfile.mkstemp(
+                    prefix=os.path.basename(self.path) + '.',
+                    suffix='.tmp',
+                    dir=os.path.dirname(os.path.abspath(self.path))
+                )
+
+                with os.fdopen(fd, 'w') as fp:
+                    fp.write(data)
+
+                if hasattr(os, 'replace'):
+                    os.replace(temp_path, self.path)
+                else:
+                    if os.path.exists(self.path):
+                        os.remove(self.path)
+
+                    os.rename(temp_path, self.path)
+            except (IOError, OSError) as exc:
+                log.warning('unable to save capability cache to "%s": %s', self.path, exc)
+
+                if temp_path and os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+
+_cache = None
+_cache_lock = Lock()
+
+
+def get_capability_cache():
+    """Returns the process-wide (in memory) capability cache.
+
+    :rtype: CapabilityCache
+    """
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = CapabilityCache()
+
+    return _cache
@@ -0,0 +1,69 @@
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+log = logging.getLogger(__name__)
+
+
+class JsonCodec(object):
+    def __init__(self, name, loads, dumps):
+        """JSON backend used to decode handshakes and messages.
+
+        :param name: backend name
+        :type name: str
+
+        :param loads: function decoding a `str` (or `bytes`) document
+        :type loads: function
+
+        :param dumps: function encoding an object to a `str`
+        :type dumps: function
+        """
+        self.name = name
+
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self):
+        return '<JsonCodec %r>' % self.name
+
+
+CODECS = {
+    'json': JsonCodec('json', json.loads, json.dumps)
+}
+
+if ujson is not None:
+    CODECS['ujson'] = JsonCodec('ujson', ujson.loads, ujson.dumps)
+
+if orjson is not None:
+    CODECS['orjson'] = JsonCodec('orjson', orjson.loads, lambda obj: orjson.dumps(obj).decode('utf-8'))
+
+# backends in order of preference
+PREFERENCE = ['orjson', 'ujson', 'json']
+
+
+def get_codec(name=None):
+    """Returns the codec named `name`, or the fastest available codec.
+
+    :param name: backend name ('orjson', 'ujson' or 'json')
+    :type name: str
+
+    :rtype: JsonCodec
+    """
+    if name is not None:
+        if name not in CODECS:
+            raise ValueError('JSON backend %r is not available' % name)
+
+        return CODECS[name]
+
+    for name in PREFERENCE:
+        if name in CODECS:
+            return CODECS[name]
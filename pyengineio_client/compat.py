@@ -0,0 +1,23 @@
+import sys
+
+PY2 = sys.version_info[0] == 2
+
+if PY2:
+    from httplib import IncompleteRead
+    from urllib import quote, unquote
+    from urlparse import urlparse
+
+    string_types = (basestring,)
+else:
+    from http.client import IncompleteRead
+    from urllib.parse import quote, unquote, urlparse
+
+    string_types = (str,)
+
+
+if PY2:
+    def byte_at(view, index):
+        return ord(view[index])
+else:
+    def byte_at(view, index):
+        return view[index]
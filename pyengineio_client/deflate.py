@@ -0,0 +1,172 @@
+from websocket import ABNF
+import zlib
+
+EXTENSION = 'permessage-deflate'
+
+# trailer removed from compressed messages (RFC 7692, section 7.2.1)
+TAIL = b'\x00\x00\xff\xff'
+
+
+class PerMessageDeflate(object):
+    def __init__(self, window_bits=15, level=6, threshold=1024, metrics=None):
+        """permessage-deflate (RFC 7692) codec for a websocket connection.
+
+        :param window_bits: LZ77 window size (9 - 15) used by the client and requested from the server
+        :type window_bits: int
+
+        :param level: zlib compression level (0 - 9)
+        :type level: int
+
+        :param threshold: messages smaller than this (in bytes) are sent uncompressed
+        :type threshold: int
+
+        :param metrics: metrics recorder (or `None`)
+        :type metrics: pyengineio_client.metrics.Metrics
+        """
+        self.window_bits = min(max(window_bits, 9), 15)
+        self.level = level
+        self.threshold = threshold
+        self.metrics = metrics
+
+        # negotiated parameters
+        self.client_window_bits = self.window_bits
+        self.server_window_bits = 15
+
+        self.client_no_context_takeover = False
+        self.server_no_context_takeover = False
+
+        self.compressor = None
+        self.decompressor = None
+
+        # message payload sizes before (`raw`) and after (`compressed`) compression,
+        # messages sent or received uncompressed count towards both
+        self.raw_bytes_sent = 0
+        self.compressed_bytes_sent = 0
+
+        self.raw_bytes_received = 0
+        self.compressed_bytes_received = 0
+
+    def offer(self):
+        """Returns the `Sec-WebSocket-Extensions` handshake header.
+
+        :rtype: str
+        """
+        offer = '%s; client_max_window_bits' % EXTENSION
+
+        if self.window_bits < 15:
+            offer += '; server_max_window_bits=%d' % self.window_bits
+
+        return 'Sec-WebSocket-Extensions: %s' % offer
+
+    def accept(self, headers):
+        """Applies the parameters accepted by the server.
+
+        :param headers: handshake response headers (with lowercase names)
+        :type headers: dict
+
+        :rtype: bool
+        :return: `True` if the server enabled compression
+        """
+        for extension in (headers or {}).get('sec-websocket-extensions', '').split(','):
+            params = [param.strip() for param in extension.split(';')]
+
+            if params[0] != EXTENSION:
+                continue
+
+            for param in params[1:]:
+                name, _, value = param.partition('=')
+                value = value.strip('"')
+
+                if name == 'client_max_window_bits' and value:
+                    self.client_window_bits = min(max(int(value), 9), self.window_bits)
+                elif name == 'server_max_window_bits' and value:
+                    self.server_window_bits = int(value)
+                elif name == 'client_no_context_takeover':
+                    self.client_no_context_takeover = True
+                elif name == 'server_no_context_takeover':
+                    self.server_no_context_takeover = True
+
+            return True
+
+        return False
+
+    def create_frame(self, data, opcode):
+        """Creates a (masked) data frame, compressing messages above `threshold`.
+
+        :param data: message
+        :type data: str or bytes
+
+        :rtype: websocket.ABNF
+        """
+        if not isinstance(data, (bytes, bytearray)):
+            data = data.encode('utf-8')
+
+        data = bytes(data)
+
+        if len(data) < self.threshold:
+            self.record('sent', len(data), len(data))
+            return ABNF(1, 0, 0, 0, opcode, 1, data)
+
+        payload = self.compress(data)
+        self.record('sent', len(data), len(payload))
+
+        return ABNF(1, 1, 0, 0, opcode, 1, payload)
+
+    def compress(self, data):
+        if self.compressor is None or self.client_no_context_takeover:
+            self.compressor = zlib.compressobj(self.level, zlib.DEFLATED, -self.client_window_bits)
+
+        payload = self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        if payload.endswith(TAIL):
+            payload = payload[:-len(TAIL)]
+
+        return payload
+
+    def decode(self, payload, compressed):
+        """Returns the data of a received message.
+
+        :param payload: message payload
+        :type payload: bytes
+
+        :param compressed: message was compressed (RSV1 set on the first frame)
+        :type compressed: bool
+
+        :rtype: bytes
+        """
+        data = self.decompress(payload) if compressed else payload
+
+        self.record('received', len(data), len(payload))
+
+        return data
+
+    def decompress(self, payload):
+        if self.decompressor is None or self.server_no_context_takeover:
+            self.decompressor = zlib.decompressobj(-self.server_window_bits)
+
+        return self.decompressor.decompress(payload + TAIL)
+
+    def record(self, direction, raw, compressed):
+        if direction == 'sent':
+            self.raw_bytes_sent += raw
+            self.compressed_bytes_sent += compressed
+        else:
+            self.raw_bytes_received += raw
+            self.compressed_bytes_received += compressed
+
+        if self.metrics:
+            self.metrics.increment('deflate_raw_bytes', raw, direction=direction)
+            self.metrics.increment('deflate_compressed_bytes', compressed, direction=direction)
+
+    @property
+    def stats(self):
+        """Raw and compressed byte counters.
+
+        :rtype: dict
+        """
+        return {
+            'raw_bytes_sent': self.raw_bytes_sent,
+            'compressed_bytes_sent': self.compressed_bytes_sent,
+            'raw_bytes_received': self.raw_bytes_received,
+            'compressed_bytes_received': self.compressed_bytes_received
+        }
@@ -0,0 +1,84 @@
+from collections import deque
+from functools import wraps
+from threading import Lock
+import logging
+
+try:
+    from thread import get_ident
+except ImportError:
+    from threading import get_ident
+
+log = logging.getLogger(__name__)
+
+
+class SerialQueue(object):
+    """Runs submitted calls one at a time, in submission order.
+
+    With the `serialize` socket option every call that changes socket state
+    (`write()`, `close()`, transport and timer callbacks) runs through the
+    socket's queue. An idle queue runs the call on the calling thread, a busy
+    queue hands it over to the owning thread, nested calls run inline.
+    """
+
+    def __init__(self):
+        self.calls = deque()
+
+        # guards the hand-over of `owner` only, calls never run while it is held
+        self.lock = Lock()
+
+        # thread currently running calls (or `None` when idle)
+        self.owner = None
+
+    @property
+    def owned(self):
+        """Checks if the current thread is running calls.
+
+        :rtype: bool
+        """
+        return self.owner == get_ident()
+
+    def submit(self, func, *args, **kwargs):
+        """Runs `func` now if the queue is idle, otherwise hands it over
+           to the thread running calls."""
+        self.calls.append((func, args, kwargs))
+
+        with self.lock:
+            if self.owner is not None:
+                return
+
+            self.owner = get_ident()
+
+        self.run()
+
+    def run(self):
+        while True:
+            try:
+                func, args, kwargs = self.calls.popleft()
+            except IndexError:
+                with self.lock:
+                    if not self.calls:
+                        self.owner = None
+                        return
+
+                continue
+
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                log.warning('Exception raised in serialized call %r', func, exc_info=True)
+
+
+def serialized(func):
+    """Runs the decorated socket method through the socket's `SerialQueue`
+       (if serialization is enabled), queued calls return the socket."""
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        queue = self.serial_queue
+
+        if queue is None or queue.owned:
+            return func(self, *args, **kwargs)
+
+        queue.submit(func, self, *args, **kwargs)
+        return self
+
+    return wrapper
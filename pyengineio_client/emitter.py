@@ -0,0 +1,107 @@
+from pyemitter import Emitter
+from threading import Lock
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class FastEmitter(Emitter):
+    """`Emitter` with a cheaper `emit()`, used for the hot packet events.
+
+    Listeners are stored as tuples (replaced when listeners are added or
+    removed) so `emit()` doesn't copy the listener list, events without
+    listeners return immediately and arguments are never formatted for
+    debug logging.
+    """
+
+    # event name -> tuple of listeners (created on the first `on()`)
+    listeners = None
+
+    # guards listener changes (shared, listeners are rarely changed), `emit()` reads without it
+    listeners_lock = Lock()
+
+    def on(self, events, func=None, on_bound=None):
+        if not func:
+            # assume decorator, wrap
+            def wrap(func):
+                self.on(events, func, on_bound)
+                return func
+
+            return wrap
+
+        if not isinstance(events, (list, tuple)):
+            events = [events]
+
+        with self.listeners_lock:
+            if self.listeners is None:
+                self.listeners = {}
+
+            for event in events:
+                self.listeners[event] = self.listeners.get(event, ()) + (func,)
+
+        if on_bound:
+            on_bound(func=func)
+
+        return self
+
+    def once(self, event, func=None):
+        if not func:
+            # assume decorator, wrap
+            def wrap(func):
+                self.once(event, func)
+                return func
+
+            return wrap
+
+        def once_callback(*args, **kwargs):
+            self.off(event, once_callback)
+            func(*args, **kwargs)
+
+        return self.on(event, once_callback)
+
+    def off(self, event=None, func=None):
+        if func and not event:
+            raise ValueError('"event" is required if "func" is specified')
+
+        with self.listeners_lock:
+            if not self.listeners:
+                return self
+
+            if event and event not in self.listeners:
+                return self
+
+            if event and func:
+                listeners = list(self.listeners[event])
+
+                if func in listeners:
+                    listeners.remove(func)
+                    self.listeners[event] = tuple(listeners)
+            elif event:
+                del self.listeners[event]
+            else:
+                self.listeners = {}
+
+        return self
+
+    def emit(self, event, *args, **kwargs):
+        kwargs.pop('__suppress', None)
+
+        listeners = self.listeners.get(event) if self.listeners else None
+
+        if not listeners:
+            return self
+
+        for callback in listeners:
+            try:
+                callback(*args, **kwargs)
+            except Exception:
+                log.warning('Exception raised in callback %s for event "%s"', callback, event, exc_info=True)
+
+        return self
+
+    def has_listeners(self, event):
+        """Checks if `event` has any listeners.
+
+        :rtype: bool
+        """
+        return bool(self.listeners and self.listeners.get(event))
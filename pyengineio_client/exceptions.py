@@ -1,3 +1,14 @@
 class TransportError(Exception):
     def __init__(self, message, desc):
         super(TransportError, self).__init__(message, desc)
+
+        self.message = message
+        self.desc = desc
+
+
+class ReceiveQueueClosed(Exception):
+    pass
+
+
+class ReceiveTimeout(Exception):
+    pass
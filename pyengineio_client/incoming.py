@@ -0,0 +1,144 @@
+from pyengineio_client.exceptions import ReceiveQueueClosed, ReceiveTimeout
+from pyengineio_client.util import monotonic
+
+from collections import deque
+from threading import Condition
+
+
+class ReceiveQueue(object):
+    def __init__(self, maxsize=None, policy='drop_oldest', metrics=None):
+        """Queue of received messages, consumed with `get()`, so slow
+           message processing doesn't hold up the transport.
+
+        :param maxsize: maximum number of queued messages (or `None` for no limit)
+        :type maxsize: int
+
+        :param policy: handling of messages received while the queue is full:
+                       'drop_oldest', 'drop_new' or 'block' (wait for space,
+                       holding up the transport)
+        :type policy: str
+
+        :param metrics: metrics recorder (or `None`)
+        :type metrics: pyengineio_client.metrics.Metrics
+        """
+        self.maxsize = maxsize
+        self.policy = policy
+        self.metrics = metrics
+
+        self.messages = deque()
+        self.condition = Condition()
+
+        self.closed = False
+
+        # number of dropped messages, and seconds spent waiting for space
+        self.dropped = 0
+        self.blocked_time = 0.0
+
+        # called (without arguments) after a message is queued or the queue is closed
+        self.listener = None
+
+    def __len__(self):
+        return len(self.messages)
+
+    @property
+    def full(self):
+        return self.maxsize is not None and len(self.messages) >= self.maxsize
+
+    def put(self, message):
+        """Queues a received message, applying `policy` if the queue is full."""
+        with self.condition:
+            if self.closed:
+                return
+
+            if self.full:
+                if self.policy == 'drop_new':
+                    self.drop()
+                    return
+
+                if self.policy == 'drop_oldest':
+                    self.messages.popleft()
+                    self.drop()
+                else:
+                    self.wait_for_space()
+
+                    if self.closed:
+                        return
+
+            self.messages.append(message)
+            self.condition.notify_all()
+
+        if self.listener:
+            self.listener()
+
+    def drop(self):
+        self.dropped += 1
+
+        if self.metrics:
+            self.metrics.increment('received_messages_dropped')
+
+    def wait_for_space(self):
+        started = monotonic()
+
+        while self.full and not self.closed:
+            self.condition.wait()
+
+        blocked = monotonic() - started
+        self.blocked_time += blocked
+
+        if self.metrics:
+            self.metrics.observe('receive_blocked_seconds', blocked)
+
+    def get(self, block=True, timeout=None):
+        """Returns the next message.
+
+        :param block: wait for a message if the queue is empty
+        :type block: bool
+
+        :param timeout: seconds to wait (or `None` to wait indefinitely)
+        :type timeout: float
+
+        :return: message
+        :raises ReceiveTimeout: no message was received in time (or the queue is empty when not blocking)
+        :raises ReceiveQueueClosed: the queue is closed and empty
+        """
+        deadline = monotonic() + timeout if timeout is not None else None
+
+        with self.condition:
+            while not self.messages:
+                if self.closed:
+                    raise ReceiveQueueClosed()
+
+                if not block:
+                    raise ReceiveTimeout()
+
+                if deadline is None:
+                    self.condition.wait()
+                    continue
+
+                remaining = deadline - monotonic()
+
+                if remaining <= 0:
+                    raise ReceiveTimeout()
+
+                self.condition.wait(remaining)
+
+            message = self.messages.popleft()
+
+            # wake up a transport waiting for space
+            self.condition.notify_all()
+
+            return message
+
+    def open(self):
+        """Re-opens the queue after `close()` (when the socket is re-opened)."""
+        with self.condition:
+            self.closed = False
+
+    def close(self):
+        """Closes the queue, queued messages can still be retrieved."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+        if self.listener:
+            self.listener()
@@ -0,0 +1,214 @@
+from threading import Lock
+import bisect
+import logging
+import socket
+
+log = logging.getLogger(__name__)
+
+# histogram buckets for durations (seconds)
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# histogram buckets for counts (packets)
+COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+BUCKETS = {
+    'flush_batch_packets': COUNT_BUCKETS,
+    'write_buffer_packets': COUNT_BUCKETS
+}
+
+
+def metric_key(name, labels):
+    if not labels:
+        return name, ()
+
+    return name, tuple(sorted(labels.items()))
+
+
+class Histogram(object):
+    def __init__(self, buckets):
+        """Cumulative histogram with fixed bucket upper bounds."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Returns `(upper bound, cumulative count)` pairs, ending with `+Inf`.
+
+        :rtype: list
+        """
+        result = []
+        total = 0
+
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            result.append((bound, total))
+
+        return result
+
+
+class Metrics(object):
+    def __init__(self, sinks=None):
+        """Counters and histograms recorded by sockets and transports.
+
+        Pass a `Metrics` instance as the `metrics` socket option to enable
+        instrumentation (sockets can share one instance), with no instance
+        configured instrumentation is skipped entirely.
+
+        :param sinks: sinks forwarded every recorded value (see `CallbackSink`, `StatsdSink`)
+        :type sinks: list
+        """
+        self.sinks = sinks or []
+
+        self.counters = {}
+        self.histograms = {}
+
+        self.lock = Lock()
+
+    def increment(self, name, value=1, **labels):
+        """Increments counter `name`.
+
+        :type name: str
+        :type value: int
+        """
+        key = metric_key(name, labels)
+
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+        for sink in self.sinks:
+            sink.record('counter', name, value, labels)
+
+    def observe(self, name, value, **labels):
+        """Records `value` in histogram `name`.
+
+        :type name: str
+        :type value: float
+        """
+        key = metric_key(name, labels)
+
+        with self.lock:
+            histogram = self.histograms.get(key)
+
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(BUCKETS.get(name, TIME_BUCKETS))
+
+            histogram.observe(value)
+
+        for sink in self.sinks:
+            sink.record('histogram', name, value, labels)
+
+    def snapshot(self):
+        """Returns the current counter values and histogram summaries.
+
+        :rtype: dict
+        """
+        with self.lock:
+            return {
+                'counters': dict(
+                    (format_name(name, labels), value)
+                    for (name, labels), value in self.counters.items()
+                ),
+                'histograms': dict(
+                    (format_name(name, labels), {
+                        'count': histogram.count,
+                        'sum': histogram.sum,
+                        'buckets': histogram.cumulative()
+                    })
+                    for (name, labels), histogram in self.histograms.items()
+                )
+            }
+
+    def prometheus(self, prefix='engineio_'):
+        """Exports metrics in the Prometheus text exposition format.
+
+        :rtype: str
+        """
+        lines = []
+
+        with self.lock:
+            for name in sorted(set(name for name, _ in self.counters)):
+                lines.append('# TYPE %s%s_total counter' % (prefix, name))
+
+                for (key, labels), value in sorted(self.counters.items()):
+                    if key == name:
+                        lines.append('%s%s_total%s %s' % (prefix, name, format_labels(labels), value))
+
+            for name in sorted(set(name for name, _ in self.histograms)):
+                lines.append('# TYPE %s%s histogram' % (prefix, name))
+
+                for (key, labels), histogram in sorted(self.histograms.items()):
+                    if key != name:
+                        continue
+
+                    for bound, count in histogram.cumulative():
+                        lines.append('%s%s_bucket%s %s' % (
+                            prefix, name, format_labels(labels + (('le', bound),)), count
+                        ))
+
+                    lines.append('%s%s_sum%s %s' % (prefix, name, format_labels(labels), histogram.sum))
+                    lines.append('%s%s_count%s %s' % (prefix, name, format_labels(labels), histogram.count))
+
+        return '\n'.join(lines) + '\n'
+
+
+def format_name(name, labels):
+    if not labels:
+        return name
+
+    return '%s%s' % (name, format_labels(labels))
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+
+    return '{%s}' % ','.join('%s="%s"' % (key, value) for key, value in labels)
+
+
+class CallbackSink(object):
+    def __init__(self, callback):
+        """Calls `callback(kind, name, value, labels)` for every recorded value.
+
+        :type callback: function
+        """
+        self.callback = callback
+
+    def record(self, kind, name, value, labels):
+        self.callback(kind, name, value, labels)
+
+
+class StatsdSink(object):
+    def __init__(self, host='127.0.0.1', port=8125, prefix='engineio'):
+        """Sends every recorded value to a statsd server (over UDP).
+
+        Counters are sent as `|c`, durations (`*_seconds`) as `|ms`
+        and other histograms as `|h`, labels are appended to the name.
+        """
+        self.address = (host, port)
+        self.prefix = prefix
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def record(self, kind, name, value, labels):
+        if labels:
+            name = '%s.%s' % (name, '.'.join(str(labels[key]) for key in sorted(labels)))
+
+        if kind == 'counter':
+            line = '%s.%s:%s|c' % (self.prefix, name, value)
+        elif name.endswith('_seconds'):
+            line = '%s.%s:%.3f|ms' % (self.prefix, name, value * 1000)
+        else:
+            line = '%s.%s:%s|h' % (self.prefix, name, value)
+
+        try:
+            self.sock.sendto(line.encode('utf-8'), self.address)
+        except socket.error as exc:
+            log.debug('unable to send metric: %s', exc)
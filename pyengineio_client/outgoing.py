@@ -0,0 +1,215 @@
+from pyengineio_client.util import packet_size
+
+from collections import deque
+from itertools import islice
+
+
+class OutgoingQueue(object):
+    def __init__(self, max_batch=None):
+        """Queue of packets waiting to be written, each entry is a
+           `[packet, callback, key]` list (`key` is the coalescing key, or `None`).
+
+        Markers (entries without a packet, see `add_marker()`) complete
+        once every entry before them has been written.
+
+        Entries at the head of the queue are "in flight" once taken by
+        `take_batch()`, they are removed by `acknowledge()` when the
+        transport drains.
+
+        :param max_batch: maximum number of packets taken per batch (or `None`)
+        :type max_batch: int
+        """
+        self.entries = deque()
+        self.max_batch = max_batch
+
+        # number of entries at the head of the queue currently being written
+        self.in_flight = 0
+
+        # total size of buffered packet data
+        self.bytes = 0
+
+        # last unsent entry appended with each coalescing key
+        self.keys = {}
+
+        # number of markers in the queue
+        self.markers = 0
+
+    def __len__(self):
+        """Number of queued packets (excluding markers)."""
+        return len(self.entries) - self.markers
+
+    def __iter__(self):
+        for packet, _, _ in self.entries:
+            if packet is not None:
+                yield packet
+
+    def append(self, packet, callback=None, key=None):
+        entry = [packet, callback, key]
+
+        self.entries.append(entry)
+        self.bytes += packet_size(packet)
+
+        if key is not None:
+            self.keys[key] = entry
+
+    def add_marker(self, callback):
+        """Adds a marker, `callback` is returned by `acknowledge()` once
+           every entry before the marker has been written.
+
+        :rtype: bool
+        :return: `False` if the queue is empty (nothing to wait for)
+        """
+        if not len(self):
+            return False
+
+        self.entries.append([None, callback, None])
+        self.markers += 1
+
+        return True
+
+    def find(self, key):
+        """Returns the last unsent entry appended with `key` (or `None`).
+
+        :rtype: list
+        """
+        return self.keys.get(key)
+
+    def take_batch(self):
+        """Marks the next batch as in flight and returns its packets.
+
+        :rtype: list
+        """
+        count = 0
+        packets = []
+
+        for entry in self.entries:
+            if self.max_batch is not None and len(packets) >= self.max_batch:
+                break
+
+            count += 1
+
+            if entry[0] is None:
+                continue
+
+            # in flight entries can't be replaced
+            self.unindex(entry)
+
+            packets.append(entry[0])
+
+        self.in_flight = count
+
+        return packets
+
+    def acknowledge(self):
+        """Removes the in flight batch (and any markers it completes) from the queue.
+
+        :rtype: list
+        :return: callbacks of the acknowledged packets and completed markers
+        """
+        callbacks = []
+
+        for _ in range(self.in_flight):
+            packet, callback, _ = self.entries.popleft()
+
+            if packet is None:
+                self.markers -= 1
+            else:
+                self.bytes -= packet_size(packet)
+
+            callbacks.append(callback)
+
+        self.in_flight = 0
+
+        return callbacks + self.pop_markers()
+
+    def pop_markers(self):
+        """Removes markers at the head of the queue (with nothing left to wait for).
+
+        :rtype: list
+        :return: marker callbacks
+        """
+        callbacks = []
+
+        while self.entries and self.entries[0][0] is None and not self.in_flight:
+            callbacks.append(self.entries.popleft()[1])
+            self.markers -= 1
+
+        return callbacks
+
+    def requeue(self, types=('message',)):
+        """Returns the in flight batch to the queue (to be written again)
+           and removes entries with a packet type not in `types`.
+
+        :param types: packet types to keep
+        :type types: tuple
+
+        :rtype: list
+        :return: callbacks of markers left with nothing to wait for
+        """
+        self.in_flight = 0
+
+        for index in reversed(range(len(self.entries))):
+            packet = self.entries[index][0]
+
+            if packet is not None and packet['type'] not in types:
+                self.remove(index)
+
+        self.keys = {}
+
+        for entry in self.entries:
+            if entry[2] is not None:
+                self.keys[entry[2]] = entry
+
+        return self.pop_markers()
+
+    def unsent(self):
+        """Iterates over `(index, entry)` for packet entries not yet in flight."""
+        for index, entry in enumerate(islice(self.entries, self.in_flight, None), self.in_flight):
+            if entry[0] is not None:
+                yield index, entry
+
+    def replace(self, entry, packet, callback=None):
+        """Replaces the packet of an unsent entry (keeping its key), the replaced
+           packet's callback is called along with `callback` once the entry is written."""
+        self.bytes += packet_size(packet) - packet_size(entry[0])
+
+        entry[0] = packet
+        entry[1] = chain(entry[1], callback)
+
+    def remove(self, index):
+        """Removes the unsent entry at `index`.
+
+        :rtype: dict
+        :return: removed packet
+        """
+        if index == 0:
+            entry = self.entries.popleft()
+        else:
+            entry = self.entries[index]
+            del self.entries[index]
+
+        self.bytes -= packet_size(entry[0])
+        self.unindex(entry)
+
+        return entry[0]
+
+    def unindex(self, entry):
+        key = entry[2]
+
+        if key is not None and self.keys.get(key) is entry:
+            del self.keys[key]
+
+
+def chain(first, second):
+    """Returns a callback calling `first` then `second` (either can be `None`)."""
+    if not first:
+        return second
+
+    if not second:
+        return first
+
+    def callback():
+        first()
+        second()
+
+    return callback
@@ -0,0 +1,226 @@
+from pyengineio_client.compat import PY2, byte_at
+
+import codecs
+import pyengineio_parser as parser
+
+# engine.io packet types, indexed by their numeric code
+PACKET_TYPES = ['open', 'close', 'ping', 'pong', 'message', 'upgrade', 'noop']
+
+ERROR_PACKET = {'type': 'error', 'data': 'parser error'}
+
+
+def is_binary_payload(view):
+    """Checks if `view` holds a binary (XHR2) encoded payload.
+
+    :type view: memoryview
+    :rtype: bool
+    """
+    return len(view) > 0 and byte_at(view, 0) in (0, 1)
+
+
+def decode_packet_view(view):
+    """Decodes a binary packet, the packet data is a slice of `view` (not a copy).
+
+    :type view: memoryview
+    :rtype: dict
+    """
+    if not len(view):
+        return ERROR_PACKET
+
+    code = byte_at(view, 0)
+
+    if code >= len(PACKET_TYPES):
+        return ERROR_PACKET
+
+    return {'type': PACKET_TYPES[code], 'data': view[1:]}
+
+
+def decode_payload_view(view, callback):
+    """Decodes a binary (XHR2) encoded payload, binary packets are
+       returned as `memoryview` slices of the payload buffer.
+
+    :param view: payload buffer
+    :type view: memoryview
+
+    :param callback: called with `(packet, index, total)` for each packet
+    :type callback: function
+    """
+    packets = []
+
+    offset = 0
+    total = len(view)
+
+    try:
+        while offset < total:
+            is_string = byte_at(view, offset) == 0
+            offset += 1
+
+            # length is encoded as one byte per decimal digit, terminated by 255
+            length = 0
+
+            while byte_at(view, offset) != 255:
+                length = length * 10 + byte_at(view, offset)
+                offset += 1
+
+            offset += 1
+            end = offset + length
+
+            if end > total:
+                raise ValueError('incomplete packet')
+
+            if is_string:
+                data = view[offset:end].tobytes()
+
+                if not PY2:
+                    data = data.decode('utf-8')
+
+                packets.append(parser.decode_packet(data))
+            else:
+                packets.append(decode_packet_view(view[offset:end]))
+
+            offset = end
+    except (IndexError, ValueError):
+        callback(ERROR_PACKET, 0, 1)
+        return
+
+    for index, packet in enumerate(packets):
+        if callback(packet, index, len(packets)) is False:
+            return
+
+
+class PayloadDecoder(object):
+    def __init__(self, callback):
+        """Incremental payload decoder, each packet is passed to `callback`
+           as soon as its length-prefixed frame has been received.
+
+        :param callback: called with each decoded packet
+        :type callback: function
+        """
+        self.callback = callback
+
+        # payload encoding, detected from the first byte
+        self.binary = None
+
+        self.buffer = bytearray()
+
+        # decoded text chunks, joined once the packet in progress is complete
+        self.text = []
+        self.text_length = 0
+
+        # length the text has to reach to complete the packet in progress (or `None`)
+        self.text_needed = None
+
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+
+        self.failed = False
+
+    def feed(self, chunk):
+        """Decodes the next chunk of the payload.
+
+        :type chunk: str or bytes
+        """
+        if self.failed or not chunk:
+            return
+
+        if self.binary is None:
+            self.binary = byte_at(chunk, 0) in (0, 1)
+
+        if self.binary:
+            self.buffer.extend(chunk)
+            self.decode_binary()
+        else:
+            text = self.text_decoder.decode(chunk)
+
+            self.text.append(text)
+            self.text_length += len(text)
+
+            if self.text_needed is None or self.text_length >= self.text_needed:
+                self.decode_text()
+
+    def close(self):
+        """Finishes decoding, a truncated payload is reported as an error packet."""
+        if self.failed:
+            return
+
+        if self.buffer or self.text or self.text_decoder.decode(b'', True):
+            self.fail()
+
+    def fail(self):
+        self.failed = True
+        self.callback(ERROR_PACKET)
+
+    def decode_text(self):
+        text = u''.join(self.text)
+        offset = 0
+
+        self.text_needed = None
+
+        while True:
+            separator = text.find(u':', offset)
+
+            if separator == -1:
+                break
+
+            try:
+                length = int(text[offset:separator])
+            except ValueError:
+                return self.fail()
+
+            end = separator + 1 + length
+
+            if end > len(text):
+                # wait for the rest of the packet before joining again
+                self.text_needed = end - offset
+                break
+
+            data = text[separator + 1:end]
+
+            if PY2:
+                data = data.encode('utf-8')
+
+            offset = end
+            self.callback(parser.decode_packet(data))
+
+        text = text[offset:]
+
+        self.text = [text] if text else []
+        self.text_length = len(text)
+
+    def decode_binary(self):
+        buf = self.buffer
+
+        offset = 0
+        total = len(buf)
+
+        while offset < total:
+            is_string = buf[offset] == 0
+
+            # length is encoded as one byte per decimal digit, terminated by 255
+            start = buf.find(b'\xff', offset + 1)
+
+            if start == -1:
+                break
+
+            length = 0
+
+            for digit in buf[offset + 1:start]:
+                length = length * 10 + digit
+
+            start += 1
+            end = start + length
+
+            if end > total:
+                break
+
+            data = buf[start:end]
+
+            if is_string:
+                data = bytes(data)
+
+                if not PY2:
+                    data = data.decode('utf-8')
+
+            offset = end
+            self.callback(parser.decode_packet(data))
+
+        del buf[:offset]
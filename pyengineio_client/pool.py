@@ -0,0 +1,162 @@
+from pyengineio_client.reactor import get_reactor
+from pyengineio_client.scheduler import get_scheduler
+from pyengineio_client.socket import Socket
+
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from requests_futures.sessions import FuturesSession
+from threading import Lock
+import logging
+
+log = logging.getLogger(__name__)
+
+# minimum size of the poll executor (when sized by the number of sockets)
+MIN_POLL_WORKERS = 4
+
+
+class SocketPool(object):
+    def __init__(self, opts=None):
+        """Manager for many sockets, sockets created with `SocketPool.socket()`
+           share the pool's HTTP connections, worker threads and ping scheduler.
+
+        :param opts: options
+        :type opts: dict
+        """
+        opts = opts or {}
+
+        self.scheduler = opts.get('scheduler') or get_scheduler()
+
+        # websocket reads are multiplexed onto a shared reactor thread,
+        # pass `reactor: False` to use a thread per websocket instead
+        reactor = opts.get('reactor', True)
+        self.reactor = get_reactor() if reactor is True else (reactor or None)
+
+        # size of the HTTP connection pool (per host)
+        self.max_connections = opts.get('max_connections', 100)
+
+        # worker threads for long-polls, each in-flight poll occupies a worker
+        # until the server responds, so by default the poll executor is resized
+        # with the number of sockets (`max_poll_workers` sets a fixed size)
+        self.max_poll_workers = opts.get('max_poll_workers')
+        self.poll_workers = self.max_poll_workers or MIN_POLL_WORKERS
+
+        # worker threads for writes (POSTs), kept apart from the polls
+        # so writes never queue behind in-flight long-polls
+        self.max_write_workers = opts.get('max_write_workers', 16)
+
+        self.poll_session = self.create_session(self.poll_workers)
+        self.write_session = self.create_session(self.max_write_workers)
+
+        self.sockets = set()
+        self.lock = Lock()
+
+    def create_session(self, max_workers):
+        """Creates an HTTP session shared by polling transports.
+
+        :param max_workers: number of worker threads
+        :type max_workers: int
+
+        :rtype: requests_futures.sessions.FuturesSession
+        """
+        session = FuturesSession(max_workers=max_workers)
+
+        adapter = HTTPAdapter(
+            pool_connections=self.max_connections,
+            pool_maxsize=self.max_connections
+        )
+
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        return session
+
+    def socket(self, uri, opts=None):
+        """Creates a socket bound to this pool.
+
+        :param uri: uri
+        :type uri: str
+
+        :param opts: socket options
+        :type opts: dict
+
+        :rtype: pyengineio_client.socket.Socket
+        """
+        opts = opts or {}
+        opts['pool'] = self
+
+        return Socket(uri, opts)
+
+    def register(self, socket):
+        with self.lock:
+            self.sockets.add(socket)
+
+            self.resize_poll_workers()
+
+    def unregister(self, socket):
+        with self.lock:
+            self.sockets.discard(socket)
+
+            self.resize_poll_workers()
+
+    def resize_poll_workers(self):
+        """Replaces the poll executor when the number of sockets outgrows it (or drops
+           well below it), sized with headroom so it isn't replaced on every change."""
+        if self.max_poll_workers is not None:
+            return
+
+        count = len(self.sockets)
+
+        grow = count > self.poll_workers
+        shrink = self.poll_workers > MIN_POLL_WORKERS and count * 4 < self.poll_workers
+
+        if not (grow or shrink):
+            return
+
+        self.poll_workers = max(count * 2, MIN_POLL_WORKERS)
+
+        log.debug('resizing poll executor to %d workers', self.poll_workers)
+
+        # polls in flight finish on the previous executor's threads
+        executor, self.poll_session.executor = self.poll_session.executor, ThreadPoolExecutor(self.poll_workers)
+        executor.shutdown(wait=False)
+
+    @property
+    def stats(self):
+        """Pool statistics, calculated on request.
+
+        :rtype: dict
+        """
+        with self.lock:
+            sockets = list(self.sockets)
+
+        stats = {
+            'sockets': len(sockets),
+            'open': 0,
+            'polling': 0,
+            'poll_workers': self.poll_workers,
+            'buffered_packets': 0
+        }
+
+        for socket in sockets:
+            if socket.ready_state == 'open':
+                stats['open'] += 1
+
+            if getattr(socket.transport, 'polling', False):
+                stats['polling'] += 1
+
+            stats['buffered_packets'] += len(socket.write_buffer)
+
+        return stats
+
+    def close(self):
+        """Closes every socket in the pool and releases shared resources."""
+        with self.lock:
+            sockets = list(self.sockets)
+
+        log.debug('closing %d pooled sockets', len(sockets))
+
+        for socket in sockets:
+            socket.close()
+
+        self.poll_session.close()
+        self.write_session.close()
@@ -0,0 +1,525 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Thread
+import errno
+import logging
+import socket
+import ssl
+import struct
+import websocket
+import zlib
+
+try:
+    import selectors
+except ImportError:
+    try:
+        # python 2.x backport
+        import selectors34 as selectors
+    except ImportError:
+        selectors = None
+
+log = logging.getLogger(__name__)
+
+ABNF = websocket.ABNF
+
+# errors raised by non-blocking sockets when no more data can be transferred
+WOULD_BLOCK = (errno.EAGAIN, errno.EWOULDBLOCK)
+SSL_WANT = (ssl.SSLWantReadError, ssl.SSLWantWriteError) if hasattr(ssl, 'SSLWantReadError') else ()
+
+
+def would_block(exc):
+    if SSL_WANT and isinstance(exc, SSL_WANT):
+        return True
+
+    return getattr(exc, 'errno', None) in WOULD_BLOCK
+
+
+class FrameReader(object):
+    def __init__(self):
+        """Incremental websocket frame parser, used for compressed connections
+           (`websocket.WebSocket.recv_frame()` rejects frames with RSV1 set)."""
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        self.buffer.extend(data)
+
+    def next_frame(self):
+        """Returns the next complete frame, or `None` if more data is required.
+
+        :rtype: websocket.ABNF
+        """
+        buf = self.buffer
+
+        if len(buf) < 2:
+            return None
+
+        length = buf[1] & 0x7f
+        offset = 2
+
+        if length == 126:
+            if len(buf) < 4:
+                return None
+
+            length = struct.unpack('!H', bytes(buf[2:4]))[0]
+            offset = 4
+        elif length == 127:
+            if len(buf) < 10:
+                return None
+
+            length = struct.unpack('!Q', bytes(buf[2:10]))[0]
+            offset = 10
+
+        masked = buf[1] & 0x80
+
+        if len(buf) < offset + (4 if masked else 0) + length:
+            return None
+
+        mask_key = None
+
+        if masked:
+            mask_key = bytes(buf[offset:offset + 4])
+            offset += 4
+
+        payload = bytes(buf[offset:offset + length])
+
+        if mask_key:
+            payload = ABNF.mask(mask_key, payload)
+
+        b1 = buf[0]
+        del buf[:offset + length]
+
+        return ABNF(b1 >> 7 & 1, b1 >> 6 & 1, b1 >> 5 & 1, b1 >> 4 & 1, b1 & 0x0f, 0, payload)
+
+
+class ReactorConnection(object):
+    def __init__(self, reactor, transport, ws):
+        """Websocket connection owned by a `Reactor`, all socket reads and
+           writes happen on the reactor thread.
+
+        :param reactor: owning reactor
+        :type reactor: Reactor
+
+        :param transport: websocket transport receiving frames
+        :type transport: pyengineio_client.transports.ws.WebSocket
+
+        :param ws: connected websocket
+        :type ws: websocket.WebSocket
+        """
+        self.reactor = reactor
+        self.transport = transport
+        self.ws = ws
+
+        self.sock = ws.sock
+
+        # permessage-deflate codec (if compression was negotiated)
+        self.deflate = transport.deflate
+
+        if self.deflate:
+            self.reader = FrameReader()
+
+            # `[opcode, compressed, fragments]` of the message being received
+            self.message = None
+
+        # encoded frames waiting to be written
+        self.outgoing = deque()
+        self.outgoing_lock = Lock()
+
+        self.closing = False
+        self.closed = False
+
+    def send(self, data):
+        """Queues a data frame, can be called from any thread.
+
+        :param data: frame payload
+        :type data: str or bytearray
+        """
+        binary = isinstance(data, (bytes, bytearray)) and not isinstance(data, str)
+
+        if self.deflate:
+            # compressor context is shared between messages, so frames
+            # are compressed in the order they are queued
+            with self.outgoing_lock:
+                frame = self.deflate.create_frame(data, ABNF.OPCODE_BINARY if binary else ABNF.OPCODE_TEXT)
+                self.outgoing.append(frame.format())
+
+            self.reactor.call(self.update)
+            return
+
+        if binary:
+            frame = ABNF.create_frame(bytes(data), ABNF.OPCODE_BINARY)
+        else:
+            frame = ABNF.create_frame(data, ABNF.OPCODE_TEXT)
+
+        self.queue(frame.format())
+
+    def queue(self, data):
+        with self.outgoing_lock:
+            self.outgoing.append(data)
+
+        self.reactor.call(self.update)
+
+    def close(self):
+        """Sends a close frame and closes the socket once it has been written."""
+        if self.closing:
+            return
+
+        self.closing = True
+
+        frame = ABNF.create_frame(b'\x03\xe8', ABNF.OPCODE_CLOSE)
+        self.queue(frame.format())
+
+    def update(self):
+        """Registers interest in writes while frames are queued."""
+        if self.closed:
+            return
+
+        self.on_writable()
+
+    def on_readable(self):
+        if self.deflate:
+            self.read_frames()
+            return
+
+        while not self.closed:
+            try:
+                frame = self.ws.recv_frame()
+            except Exception as exc:
+                if would_block(exc):
+                    return
+
+                if isinstance(exc, websocket.WebSocketConnectionClosedException):
+                    self.on_close()
+                else:
+                    self.on_error(exc)
+
+                return
+
+            if frame is None:
+                continue
+
+            self.on_frame(frame)
+
+    def read_frames(self):
+        """Reads frames from a compressed connection."""
+        while not self.closed:
+            try:
+                data = self.sock.recv(65536)
+            except Exception as exc:
+                if not would_block(exc):
+                    self.on_error(exc)
+
+                return
+
+            if not data:
+                self.on_close()
+                return
+
+            self.reader.feed(data)
+
+            frame = self.reader.next_frame()
+
+            while frame is not None and not self.closed:
+                self.on_frame(frame)
+                frame = self.reader.next_frame()
+
+    def on_frame(self, frame):
+        if frame.opcode in (ABNF.OPCODE_TEXT, ABNF.OPCODE_BINARY, ABNF.OPCODE_CONT):
+            try:
+                message = self.assemble(frame) if self.deflate else self.extract(frame)
+            except (websocket.WebSocketException, zlib.error) as exc:
+                self.on_error(exc)
+                return
+
+            if message is None:
+                return
+
+            opcode, data = message
+
+            if opcode == ABNF.OPCODE_TEXT and isinstance(data, bytes) and not isinstance(data, str):
+                data = data.decode('utf-8')
+            elif opcode == ABNF.OPCODE_BINARY:
+                data = memoryview(data) if self.transport.binary_views else bytearray(data)
+
+            self.transport.on_data(data)
+        elif frame.opcode == ABNF.OPCODE_PING:
+            self.queue(ABNF.create_frame(frame.data, ABNF.OPCODE_PONG).format())
+        elif frame.opcode == ABNF.OPCODE_CLOSE:
+            self.on_close()
+
+    def extract(self, frame):
+        """Collects the fragments of a message.
+
+        :return: `(opcode, data)` once the message is complete, otherwise `None`
+        :rtype: tuple
+        """
+        self.ws.cont_frame.validate(frame)
+        self.ws.cont_frame.add(frame)
+
+        if not self.ws.cont_frame.is_fire(frame):
+            return None
+
+        opcode, frame = self.ws.cont_frame.extract(frame)
+
+        return opcode, frame.data
+
+    def assemble(self, frame):
+        """Collects the fragments of a (possibly compressed) message.
+
+        :return: `(opcode, data)` once the message is complete, otherwise `None`
+        :rtype: tuple
+        """
+        if frame.opcode != ABNF.OPCODE_CONT:
+            if self.message is not None:
+                raise websocket.WebSocketProtocolException('Illegal frame')
+
+            self.message = [frame.opcode, frame.rsv1, []]
+        elif self.message is None:
+            raise websocket.WebSocketProtocolException('Illegal frame')
+
+        self.message[2].append(frame.data)
+
+        if not frame.fin:
+            return None
+
+        opcode, compressed, fragments = self.message
+        self.message = None
+
+        return opcode, self.deflate.decode(b''.join(fragments), compressed)
+
+    def on_writable(self):
+        with self.outgoing_lock:
+            while self.outgoing:
+                data = self.outgoing[0]
+
+                try:
+                    sent = self.sock.send(data)
+                except Exception as exc:
+                    if would_block(exc):
+                        break
+
+                    self.outgoing.clear()
+                    self.reactor.call(self.on_error, exc)
+                    return
+
+                if sent < len(data):
+                    self.outgoing[0] = data[sent:]
+                    break
+
+                self.outgoing.popleft()
+
+            pending = bool(self.outgoing)
+
+        if pending:
+            self.reactor.modify(self, selectors.EVENT_READ | selectors.EVENT_WRITE)
+        elif self.closing:
+            self.on_close()
+        else:
+            self.reactor.modify(self, selectors.EVENT_READ)
+
+    def on_error(self, exc):
+        if self.closed:
+            return
+
+        self.shutdown()
+        self.transport.on_error(exc)
+
+    def on_close(self):
+        if self.closed:
+            return
+
+        self.shutdown()
+
+        if self.transport.ready_state != 'closed':
+            self.transport.on_close()
+
+    def shutdown(self):
+        self.closed = True
+        self.reactor.unregister(self)
+
+        try:
+            self.sock.close()
+        except socket.error:
+            pass
+
+
+class Reactor(object):
+    def __init__(self, name='pyengineio_client.reactor', connect_workers=4, connect_timeout=10):
+        """Selector loop that services every registered websocket from
+           a single thread, the number of threads stays constant no matter
+           how many connections are open.
+
+        Handshakes are blocking and run on a small fixed pool of connect workers,
+        frames are read and written on the reactor thread which also runs
+        transport callbacks (`on_open`, `on_data`, `on_close`).
+
+        :param name: reactor thread name
+        :type name: str
+
+        :param connect_workers: number of threads performing websocket handshakes
+        :type connect_workers: int
+
+        :param connect_timeout: seconds a handshake may take before failing (or `None`),
+                                so unresponsive servers can't hold up the connect workers
+        :type connect_timeout: float
+        """
+        if selectors is None:
+            raise Exception('selectors (or the "selectors34" backport) is required for the reactor')
+
+        self.name = name
+
+        self.selector = selectors.DefaultSelector()
+        self.connect_pool = ThreadPoolExecutor(max_workers=connect_workers)
+        self.connect_timeout = connect_timeout
+
+        # functions queued to run on the reactor thread
+        self.calls = deque()
+        self.calls_lock = Lock()
+
+        self.wake_r, self.wake_w = socket.socketpair()
+        self.wake_r.setblocking(False)
+        self.wake_w.setblocking(False)
+        self.wake_pending = False
+
+        self.selector.register(self.wake_r, selectors.EVENT_READ, None)
+
+        self.thread = None
+
+    def open(self, transport):
+        """Connects a websocket transport, `transport.on_open()` is called
+           on the reactor thread once the handshake completes.
+
+        :param transport: websocket transport
+        :type transport: pyengineio_client.transports.ws.WebSocket
+        """
+        self.start()
+        self.connect_pool.submit(self.connect, transport)
+
+    def connect(self, transport):
+        deflate = transport.create_deflate()
+
+        try:
+            ws = websocket.create_connection(
+                transport.uri(), fire_cont_frame=False, timeout=self.connect_timeout,
+                header=[deflate.offer()] if deflate else None
+            )
+        except Exception as exc:
+            self.call(transport.on_error, exc)
+            return
+
+        if deflate and deflate.accept(ws.getheaders()):
+            transport.deflate = deflate
+
+        connection = ReactorConnection(self, transport, ws)
+        self.call(self.register, connection)
+
+    def register(self, connection):
+        transport = connection.transport
+
+        if transport.ready_state != 'opening':
+            # transport closed during the handshake
+            connection.ws.close()
+            return
+
+        connection.sock.setblocking(False)
+        self.selector.register(connection.sock, selectors.EVENT_READ, connection)
+
+        transport.connection = connection
+        transport.on_open()
+
+        # frames may have arrived along with the handshake
+        connection.on_readable()
+
+    def modify(self, connection, events):
+        try:
+            key = self.selector.get_key(connection.sock)
+        except (KeyError, ValueError):
+            return
+
+        if key.events != events:
+            self.selector.modify(connection.sock, events, connection)
+
+    def unregister(self, connection):
+        try:
+            self.selector.unregister(connection.sock)
+        except (KeyError, ValueError):
+            pass
+
+    def call(self, func, *args):
+        """Runs `func` on the reactor thread, can be called from any thread."""
+        with self.calls_lock:
+            self.calls.append((func, args))
+
+            if self.wake_pending:
+                return
+
+            self.wake_pending = True
+
+        try:
+            self.wake_w.send(b'\x00')
+        except socket.error:
+            # wake-up already pending
+            pass
+
+    def start(self):
+        with self.calls_lock:
+            if self.thread is not None:
+                return
+
+            self.thread = Thread(target=self.run, name=self.name)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def run_calls(self):
+        try:
+            self.wake_r.recv(4096)
+        except socket.error:
+            pass
+
+        with self.calls_lock:
+            calls = list(self.calls)
+            self.calls.clear()
+
+            self.wake_pending = False
+
+        for func, args in calls:
+            self.run_callback(func, *args)
+
+    @staticmethod
+    def run_callback(func, *args):
+        try:
+            func(*args)
+        except Exception:
+            log.warning('Exception raised in reactor callback %r', func, exc_info=True)
+
+    def run(self):
+        while True:
+            for key, events in self.selector.select():
+                connection = key.data
+
+                if connection is None:
+                    self.run_calls()
+                    continue
+
+                if events & selectors.EVENT_WRITE:
+                    self.run_callback(connection.on_writable)
+
+                if events & selectors.EVENT_READ:
+                    self.run_callback(connection.on_readable)
+
+
+_reactor = None
+_reactor_lock = Lock()
+
+
+def get_reactor():
+    """Returns the process-wide websocket reactor.
+
+    :rtype: Reactor
+    """
+    global _reactor
+
+    with _reactor_lock:
+        if _reactor is None:
+            _reactor = Reactor()
+
+    return _reactor
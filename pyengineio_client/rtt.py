@@ -0,0 +1,41 @@
+class RttEstimator(object):
+    # smoothing gains (RFC 6298)
+    alpha = 0.125
+    beta = 0.25
+
+    def __init__(self):
+        """Smoothed round-trip time and jitter estimate (in milliseconds)."""
+        self.last = None
+
+        self.smoothed = None
+        self.jitter = None
+
+        self.samples = 0
+
+    def update(self, sample):
+        """Adds a round-trip time sample.
+
+        :param sample: round-trip time (in milliseconds)
+        :type sample: float
+        """
+        self.last = sample
+        self.samples += 1
+
+        if self.smoothed is None:
+            self.smoothed = sample
+            self.jitter = sample / 2.0
+            return
+
+        self.jitter = (1 - self.beta) * self.jitter + self.beta * abs(self.smoothed - sample)
+        self.smoothed = (1 - self.alpha) * self.smoothed + self.alpha * sample
+
+    def timeout(self, multiplier=4):
+        """Returns the time a response is expected within (in milliseconds),
+           or `None` if no samples have been recorded.
+
+        :rtype: float
+        """
+        if self.smoothed is None:
+            return None
+
+        return self.smoothed + multiplier * self.jitter
@@ -0,0 +1,185 @@
+from pyengineio_client.util import monotonic
+
+from threading import Condition, Lock, Thread
+import heapq
+import itertools
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class ScheduledTimer(object):
+    def __init__(self, scheduler, deadline, callback):
+        """Handle for a callback registered with a `Scheduler`.
+
+        :param scheduler: owning scheduler
+        :type scheduler: Scheduler
+
+        :param deadline: monotonic time the callback is due
+        :type deadline: float
+
+        :param callback: function to call when the deadline passes
+        :type callback: function
+        """
+        self.scheduler = scheduler
+        self.deadline = deadline
+        self.callback = callback
+
+        # deadline of the entry currently sitting in the scheduler heap
+        self.queued_deadline = None
+
+        self.cancelled = False
+        self.fired = False
+
+    @property
+    def active(self):
+        return not (self.cancelled or self.fired)
+
+    def reset(self, delay):
+        """Moves the deadline to `delay` seconds from now.
+
+        Pushing the deadline back is O(1), the heap entry is left in place
+        and re-queued lazily when it comes due.
+
+        :param delay: seconds until the callback is due
+        :type delay: float
+        """
+        self.scheduler.reset(self, delay)
+        return self
+
+    def cancel(self):
+        """Cancels the timer, the callback will not be called."""
+        self.cancelled = True
+        return self
+
+
+class Scheduler(object):
+    def __init__(self, name='pyengineio_client.scheduler'):
+        """Timer scheduler driven by a single daemon thread.
+
+        Callbacks are run on the scheduler thread and should return quickly,
+        a slow callback delays every other timer.
+
+        :param name: scheduler thread name
+        :type name: str
+        """
+        self.name = name
+
+        self.heap = []
+        self.counter = itertools.count()
+
+        self.condition = Condition()
+        self.thread = None
+
+    def schedule(self, delay, callback):
+        """Calls `callback` in `delay` seconds.
+
+        :param delay: seconds until the callback is due
+        :type delay: float
+
+        :param callback: function to call
+        :type callback: function
+
+        :rtype: ScheduledTimer
+        """
+        timer = ScheduledTimer(self, monotonic() + delay, callback)
+
+        with self.condition:
+            self._push(timer)
+
+        return timer
+
+    def reset(self, timer, delay):
+        """Moves the deadline of `timer` to `delay` seconds from now."""
+        deadline = monotonic() + delay
+
+        with self.condition:
+            timer.deadline = deadline
+            timer.cancelled = False
+            timer.fired = False
+
+            # only an earlier deadline (or a timer that has already left the
+            # heap) needs a new heap entry
+            if timer.queued_deadline is None or deadline < timer.queued_deadline:
+                self._push(timer)
+
+    def _push(self, timer):
+        timer.queued_deadline = timer.deadline
+
+        heapq.heappush(self.heap, (timer.deadline, next(self.counter), timer))
+
+        if self.thread is None:
+            self.thread = Thread(target=self.run, name=self.name)
+            self.thread.daemon = True
+            self.thread.start()
+
+        if self.heap[0][2] is timer:
+            # new earliest deadline, wake up the scheduler thread
+            self.condition.notify()
+
+    def _pop_due(self):
+        """Waits for the next due timer and removes it from the heap.
+
+        :rtype: ScheduledTimer
+        """
+        with self.condition:
+            while True:
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+
+                deadline, _, timer = self.heap[0]
+
+                if timer.queued_deadline != deadline:
+                    # stale entry, superseded by an earlier deadline
+                    heapq.heappop(self.heap)
+                    continue
+
+                if not timer.active:
+                    heapq.heappop(self.heap)
+                    timer.queued_deadline = None
+                    continue
+
+                now = monotonic()
+
+                if deadline > now:
+                    self.condition.wait(deadline - now)
+                    continue
+
+                heapq.heappop(self.heap)
+
+                if timer.deadline > deadline:
+                    # deadline was pushed back, re-queue it
+                    self._push(timer)
+                    continue
+
+                timer.queued_deadline = None
+                timer.fired = True
+                return timer
+
+    def run(self):
+        while True:
+            timer = self._pop_due()
+
+            try:
+                timer.callback()
+            except Exception:
+                log.warning('Exception raised in scheduled callback %r', timer.callback, exc_info=True)
+
+
+_scheduler = None
+_scheduler_lock = Lock()
+
+
+def get_scheduler():
+    """Returns the process-wide scheduler, shared by every `Socket`.
+
+    :rtype: Scheduler
+    """
+    global _scheduler
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler()
+
+    return _scheduler
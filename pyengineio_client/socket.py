@@ -1,19 +1,34 @@
+from pyengineio_client.capabilities import CapabilityCache, get_capability_cache
+from pyengineio_client.codec import get_codec
+from pyengineio_client.compat import string_types
+from pyengineio_client.dispatch import SerialQueue, get_ident, serialized
+from pyengineio_client.emitter import FastEmitter
+from pyengineio_client.exceptions import ReceiveQueueClosed
+from pyengineio_client.incoming import ReceiveQueue
+from pyengineio_client.outgoing import OutgoingQueue
+from pyengineio_client.reactor import get_reactor
+from pyengineio_client.rtt import RttEstimator
+from pyengineio_client.scheduler import get_scheduler
 from pyengineio_client.transports import TRANSPORTS
 from pyengineio_client.url import parse_url
-from pyengineio_client.util import qs_decode
+from pyengineio_client.util import half, monotonic, qs_decode
 
-from pyemitter import Emitter
-from threading import Timer, Event
+from contextlib import contextmanager
+from functools import wraps
+from threading import Event, Lock
 import pyengineio_parser as parser
-import json
 import logging
+import random
 
 log = logging.getLogger(__name__)
 
 
-class Socket(Emitter):
+class Socket(FastEmitter):
     prior_websocket_success = False
 
+    # available transport classes, by name
+    transport_classes = TRANSPORTS
+
     def __init__(self, uri, opts=None):
         """Socket constructor.
 
@@ -25,6 +40,9 @@ class Socket(Emitter):
         """
         opts = opts or {}
 
+        # run state changes from every thread through a single queue (see `pyengineio_client.dispatch`)
+        self.serial_queue = SerialQueue() if opts.get('serialize') else None
+
         if uri:
             uri = parse_url(uri)
             opts['host'] = uri['host']
@@ -41,7 +59,7 @@ class Socket(Emitter):
         self.port = opts.get('port') or (443 if self.secure else 80)
 
         self.query = opts.get('query') or {}
-        if isinstance(self.query, basestring):
+        if isinstance(self.query, string_types):
             self.query = qs_decode(self.query)
 
         self.upgrade = opts.get('upgrade', True)
@@ -53,14 +71,32 @@ class Socket(Emitter):
         self.force_jsonp = opts.get('force_jsonp', False)
         self.force_base64 = opts.get('force_base64', False)
 
+        # deliver binary message data as `memoryview` slices of the received
+        # buffer (instead of copies), listeners must be able to handle views
+        self.binary_views = opts.get('binary_views', False)
+
+        # dispatch packets from long-poll responses as they are received
+        self.stream_polls = opts.get('stream_polls', False)
+
+        # JSON codec (or backend name) used for handshakes and decoded messages
+        self.codec = opts.get('codec')
+
+        if self.codec is None or isinstance(self.codec, string_types):
+            self.codec = get_codec(self.codec)
+
+        # decode text messages as JSON and emit them as `decodedMessage`
+        self.decode_messages = opts.get('decode_messages', False)
+
+        # permessage-deflate for websocket transports (`True` or a dict of
+        # `window_bits`, `level` and `threshold`)
+        self.compression = opts.get('compression')
+
         self.timestamp_param = opts.get('timestamp_param') or 't'
         self.timestamp_requests = opts.get('timestamp_requests', True)
 
         self.transports = opts.get('transports') or ['polling', 'websocket']
 
         self.ready_state = ''
-        self.write_buffer = []
-        self.callback_buffer = []
 
         self.remember_upgrade = opts.get('remember_upgrade', False)
 
@@ -70,16 +106,142 @@ class Socket(Emitter):
         self.transport = None
         self.upgrades = None
 
+        # pool sharing connections and threads with other sockets (if any)
+        self.pool = opts.get('pool')
+
+        # reactor servicing websocket reads (defaults to a thread per transport)
+        self.reactor = opts.get('reactor')
+
+        if self.reactor is True:
+            self.reactor = get_reactor()
+        elif not self.reactor and self.pool:
+            self.reactor = self.pool.reactor
+
+        # ping timers are registered with a shared scheduler thread
+        self.scheduler = opts.get('scheduler') or (self.pool.scheduler if self.pool else get_scheduler())
+
         self.ping_interval = None
         self.ping_interval_timer = None
 
         self.ping_timeout = None
         self.ping_timeout_timer = None
 
+        # liveness is checked when the ping timeout timer fires, packets only
+        # update `last_seen` (the deadline is `heartbeat_at + heartbeat_timeout`)
+        self.last_seen = None
+
+        self.heartbeat_at = None
+        self.heartbeat_timeout = None
+
         self.upgrading = False
 
-        self.write_buffer = []
-        self.prev_buffer_len = 0
+        # maximum number of packets sent per flush (`None` sends everything buffered)
+        self.max_batch = opts.get('max_batch')
+
+        self.write_buffer = OutgoingQueue(self.max_batch)
+
+        # thread running `flush()`, transports that drain within `send()` request
+        # the next flush through `flush_pending` (instead of recursing)
+        self.flushing = None
+        self.flush_pending = None
+
+        # number of open `batch()` blocks, flushing is deferred until all are closed
+        self.batching = 0
+
+        # polling writes are held for up to `coalesce_delay` ms (or until
+        # `coalesce_size` bytes are buffered) so bursts share one request
+        self.coalesce_delay = opts.get('coalesce_delay')
+        self.coalesce_size = opts.get('coalesce_size')
+        self.coalesce_timer = None
+
+        # write buffer watermarks (`None` disables a limit), `bufferHigh` is emitted
+        # when a high watermark is exceeded and `bufferLow` once the buffer
+        # is back down to both low watermarks
+        self.high_water_packets = opts.get('high_water_packets')
+        self.high_water_bytes = opts.get('high_water_bytes')
+
+        self.low_water_packets = opts.get('low_water_packets', half(self.high_water_packets))
+        self.low_water_bytes = opts.get('low_water_bytes', half(self.high_water_bytes))
+
+        # message handling above the high watermark: 'buffer', 'drop_new' or 'drop_oldest'
+        self.buffer_policy = opts.get('buffer_policy') or 'buffer'
+
+        # function returning a key for a message, an unsent message with
+        # the same key is replaced while above the high watermark
+        self.coalesce_key = opts.get('coalesce_key')
+
+        self.buffer_high = False
+        self.buffer_writable = Event()
+        self.buffer_writable.set()
+
+        self.dropped_packets = 0
+
+        # reconnect (keeping unsent messages) when the connection is lost,
+        # attempts are delayed by `reconnect_delay * 2 ^ attempt` (ms) up to
+        # `reconnect_delay_max`, randomized by `reconnect_jitter`
+        self.reconnect = opts.get('reconnect', False)
+        self.reconnect_attempts = opts.get('reconnect_attempts')
+        self.reconnect_delay = opts.get('reconnect_delay', 1000)
+        self.reconnect_delay_max = opts.get('reconnect_delay_max', 5000)
+        self.reconnect_jitter = opts.get('reconnect_jitter', 0.5)
+
+        self.reconnect_attempt = 0
+        self.reconnect_timer = None
+
+        # name of the transport the socket was last open on
+        self.last_transport = None
+
+        # connect with polling and websocket at the same time, the first
+        # transport to complete the handshake is used (the other is closed)
+        self.race_transports = opts.get('race_transports', False)
+
+        # transports currently racing (if any)
+        self.racers = None
+
+        # per-host transport capabilities, `True` uses the process-wide cache
+        self.capability_cache = opts.get('capability_cache')
+
+        if self.capability_cache is True:
+            self.capability_cache = get_capability_cache()
+
+        self.capability_key = CapabilityCache.key(self.hostname, self.port, self.secure)
+
+        # time `open()` was last called (for handshake latency)
+        self.opened_at = None
+
+        # `Metrics` instance recording counters and histograms (`None` disables instrumentation)
+        self.metrics = opts.get('metrics')
+
+        # `Tracer` hooks called around hot-path operations (`None` disables tracing)
+        self.tracer = opts.get('tracer')
+
+        # time the last ping was written (for round-trip measurement)
+        self.ping_sent_at = None
+
+        # queue received messages for `recv()` / `messages()` (holding up to
+        # `receive_queue` messages, `True` for no limit), messages received
+        # while full are handled by `receive_policy`: 'drop_oldest', 'drop_new'
+        # or 'block' (holds up the transport thread, which can delay pongs
+        # and close the socket with a ping timeout)
+        self.receive_queue = None
+
+        if opts.get('receive_queue'):
+            self.receive_queue = ReceiveQueue(
+                None if opts['receive_queue'] is True else opts['receive_queue'],
+                opts.get('receive_policy') or 'drop_oldest',
+                self.metrics
+            )
+
+        # ping round-trip time estimate, see `rtt` and `rtt_jitter`
+        self.rtt_estimator = RttEstimator()
+
+        # expect pongs within the measured round-trip time (plus `4 * jitter`)
+        # instead of the full `ping_timeout`, bounded by `min_pong_timeout` (ms)
+        self.adaptive_ping_timeout = opts.get('adaptive_ping_timeout', False)
+        self.min_pong_timeout = opts.get('min_pong_timeout', 1000)
+
+        if self.pool:
+            self.pool.register(self)
 
         self.open()
 
@@ -103,7 +265,7 @@ class Socket(Emitter):
         if self.sid:
             query['sid'] = self.sid
 
-        return TRANSPORTS[name]({
+        return self.transport_classes[name]({
             'hostname': self.hostname,
             'port': self.port,
             'secure': self.secure,
@@ -111,21 +273,42 @@ class Socket(Emitter):
             'query': query,
             'force_jsonp': self.force_jsonp,
             'force_base64': self.force_base64,
+            'binary_views': self.binary_views,
+            'stream_polls': self.stream_polls,
             'timestamp_param': self.timestamp_param,
             'timestamp_requests': self.timestamp_requests,
             'agent': self.agent,
+            'pool': self.pool,
+            'reactor': self.reactor,
+            'metrics': self.metrics,
+            'tracer': self.tracer,
+            'compression': self.compression,
             'socket': self
         })
 
+    @serialized
     def open(self):
         """Initializes transport to use and starts probe."""
         transport = None
+        self.opened_at = monotonic()
+
+        if self.receive_queue is not None:
+            self.receive_queue.open()
 
-        if self.remember_upgrade and self.prior_websocket_success and 'websocket' in self.transports:
+        if self.reconnect_attempt == 1 and self.last_transport in self.transports:
+            # reconnect straight to the transport that was working
+            transport = self.last_transport
+        elif self.websocket_supported() and 'websocket' in self.transports:
+            # skip polling for hosts known to support websocket
+            transport = 'websocket'
+        elif self.remember_upgrade and self.prior_websocket_success and 'websocket' in self.transports:
             transport = 'websocket'
         else:
             transport = self.transports[0]
 
+        if self.race_transports and transport != 'websocket' and 'websocket' in self.transports:
+            return self.race([transport, 'websocket'])
+
         self.ready_state = 'opening'
 
         transport = self.create_transport(transport)
@@ -133,6 +316,100 @@ class Socket(Emitter):
 
         self.set_transport(transport)
 
+    def race(self, names):
+        """Opens the given transports concurrently, the first transport to
+           complete the handshake becomes the socket transport.
+
+        :param names: transport names
+        :type names: list
+        """
+        log.debug('racing transports %s', ', '.join(names))
+
+        self.ready_state = 'opening'
+
+        if self.transport:
+            self.transport.off()
+
+        racers = self.racers = [self.create_transport(name) for name in names]
+        lock = Lock()
+        failed = []
+
+        def adopt(transport, packet):
+            with lock:
+                if self.racers is not racers:
+                    # race already decided (or aborted)
+                    self.discard_transport(transport, packet)
+                    return
+
+                self.racers = None
+
+            log.debug('transport "%s" won the race', transport.name)
+
+            transport.off()
+            self.set_transport(transport)
+
+            for other in racers:
+                if other is not transport:
+                    self.discard_transport(other)
+
+            self.on_packet(packet)
+
+        def fail(transport, exc=None):
+            with lock:
+                if self.racers is not racers:
+                    return
+
+                failed.append(transport)
+
+                if len(failed) < len(racers):
+                    log.debug('racing transport "%s" failed', transport.name)
+
+                    transport.off()
+                    transport.close()
+                    return
+
+                self.racers = None
+
+            # every transport failed
+            self.set_transport(transport)
+
+            if exc is None:
+                self.on_close('transport close')
+            else:
+                self.on_error(exc)
+
+        def listen(transport):
+            transport.once('packet', self.serial(lambda packet: adopt(transport, packet)))
+            transport.once('error', self.serial(lambda exc: fail(transport, exc)))
+            transport.once('close', self.serial(lambda *args: fail(transport)))
+
+        for transport in racers:
+            listen(transport)
+
+        # stand-in until the race is decided
+        self.transport = racers[0]
+
+        for transport in racers:
+            transport.open()
+
+    def discard_transport(self, transport, packet=None):
+        """Closes a transport that lost a race, a polling transport is
+           closed once its handshake arrives so the server session is closed.
+
+        :param packet: handshake packet received by the transport (if any)
+        :type packet: dict
+        """
+        transport.off()
+
+        if packet is None and transport.name == 'polling' and transport.ready_state == 'opening':
+            transport.once('packet', lambda packet: self.discard_transport(transport, packet))
+            return
+
+        if packet is not None and packet.get('type') == 'open':
+            transport.query['sid'] = self.codec.loads(packet.get('data')).get('sid')
+
+        transport.close()
+
     def set_transport(self, transport):
         """Sets the current transport. Disables the existing one (if any)."""
         log.debug('setting transport %s', transport.name)
@@ -141,6 +418,9 @@ class Socket(Emitter):
             log.debug('clearing existing transport %s', self.transport.name)
             self.transport.off()
 
+            if self.transport is not transport:
+                self.transport.release()
+
         # set up transport
         self.transport = transport
 
@@ -157,9 +437,12 @@ class Socket(Emitter):
         transport = self.create_transport(name)
         failed = Event()
 
+        started = monotonic()
+
         Socket.prior_websocket_success = False
 
         @transport.once('open')
+        @self.serial
         def transport_open():
             if self.only_binary_upgrades:
                 upgrade_loses_binary = not transport.supports_binary and self.transport.supports_binary
@@ -173,6 +456,7 @@ class Socket(Emitter):
             log.debug('probe transport "%s" opened', name)
 
             @transport.once('packet')
+            @self.serial
             def transport_packet(packet):
                 if failed.is_set():
                     return
@@ -196,20 +480,31 @@ class Socket(Emitter):
                         self.set_transport(transport)
 
                         transport.send([{'type': 'upgrade'}])
+
+                        if self.metrics:
+                            self.metrics.observe('upgrade_seconds', monotonic() - started, transport=name)
+
                         self.emit('upgrade', transport)
 
+                        self.last_transport = transport.name
+
+                        if self.capability_cache and transport.name == 'websocket':
+                            self.capability_cache.update(self.capability_key, websocket=True)
+
                         self.upgrading = False
                         self.flush()
 
                     log.debug('pausing current transport "%s"', self.transport.name)
-                    self.transport.pause(pause_callback)
+                    self.transport.pause(self.serial(pause_callback))
                 else:
                     log.debug('probe transport "%s" failed', name)
+                    self.record_upgrade_error(name)
                     self.emit('upgradeError', Exception('probe error', transport))
 
             transport.send([{'type': 'ping', 'data': 'probe'}])
 
         @transport.once('error')
+        @self.serial
         def transport_error(exc):
             if failed.is_set():
                 return
@@ -219,9 +514,11 @@ class Socket(Emitter):
             transport.close()
 
             log.debug('probe transport "%s" failed because of error: %s', name, repr(exc))
+            self.record_upgrade_error(name)
             self.emit('upgradeError', Exception('probe error: %s' % exc.message, transport.name))
 
         @transport.once('close')
+        @self.serial
         def transport_close(reason, description=None):
             if failed.is_set():
                 return
@@ -229,6 +526,7 @@ class Socket(Emitter):
             failed.set()
 
             log.debug('probe transport "%s" failed, %s', name, reason)
+            self.record_upgrade_error(name)
             self.emit('upgradeError', Exception('probe error: %s' % reason, transport.name))
 
         # Open transport to start probe
@@ -248,14 +546,59 @@ class Socket(Emitter):
                 log.debug('"%s" works - aborting "%s"', to.name, transport.name)
                 transport.close()
 
+    def serial(self, func):
+        """Wraps a callback to run through the serial queue (if enabled).
+
+        :type func: function
+        :rtype: function
+        """
+        queue = self.serial_queue
+
+        if queue is None:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if queue.owned:
+                return func(*args, **kwargs)
+
+            queue.submit(func, *args, **kwargs)
+
+        return wrapper
+
+    def record_upgrade_error(self, name):
+        if self.metrics:
+            self.metrics.increment('upgrade_errors', transport=name)
+
+        if self.capability_cache and name == 'websocket':
+            self.capability_cache.update(self.capability_key, websocket=False)
+
+    def websocket_supported(self):
+        """Checks the capability cache for websocket support.
+
+        :rtype: bool
+        """
+        if not self.capability_cache:
+            return False
+
+        return self.capability_cache.websocket_supported(self.capability_key)
+
     def on_open(self):
         """Called when connection is deemed open."""
         log.debug('socket open')
         self.ready_state = 'open'
 
         Socket.prior_websocket_success = 'websocket' == self.transport.name
+        self.last_transport = self.transport.name
 
         self.emit('open')
+
+        if self.reconnect_attempt:
+            log.debug('reconnected after %d attempt(s)', self.reconnect_attempt)
+
+            self.emit('reconnect', self.reconnect_attempt)
+            self.reconnect_attempt = 0
+
         self.flush()
 
         # we check for `readyState` in case an `open`
@@ -266,40 +609,107 @@ class Socket(Emitter):
             for upgrade in self.upgrades:
                 self.probe(upgrade)
 
+    @serialized
     def on_packet(self, packet):
         """Handles a packet."""
-        if self.ready_state in ['opening', 'open']:
+        if self.ready_state not in ['opening', 'open']:
+            log.debug('packet received with socket ready_state "%s"', self.ready_state)
+            return
+
+        if log.isEnabledFor(logging.DEBUG):
             log.debug('socket receive: type "%s", data "%s"', packet.get('type'), packet.get('data'))
 
-            self.emit('packet', packet)
+        if not self.tracer:
+            return self.dispatch_packet(packet)
+
+        span = self.tracer.span('dispatch', type=packet.get('type'))
+
+        try:
+            return self.dispatch_packet(packet)
+        finally:
+            span.finish()
+
+    def dispatch_packet(self, packet):
+        """Emits a received packet and handles it by type."""
+        self.emit('packet', packet)
+
+        # Socket is live - any packet counts
+        self.last_seen = monotonic()
+        self.emit('heartbeat')
+
+        p_type = packet.get('type')
+        p_data = packet.get('data')
+
+        if p_type == 'open':
+            return self.on_handshake(self.codec.loads(p_data))
 
-            # Socket is live - any packet counts
-            self.emit('heartbeat')
+        if p_type == 'pong':
+            if self.ping_sent_at is not None:
+                self.on_pong(monotonic() - self.ping_sent_at)
 
-            p_type = packet.get('type')
-            p_data = packet.get('data')
+            return self.set_ping()
 
-            if p_type == 'open':
-                return self.on_handshake(json.loads(p_data))
+        if p_type == 'error':
+            return self.emit('error', Exception('server error', p_data))
 
-            if p_type == 'pong':
-                return self.set_ping()
+        if p_type == 'message':
+            self.emit('data', p_data)
+            self.emit('message', p_data)
 
-            if p_type == 'error':
-                return self.emit('error', Exception('server error', p_data))
+            if self.receive_queue is not None:
+                self.receive_queue.put(p_data)
 
-            if p_type == 'message':
-                self.emit('data', p_data)
-                self.emit('message', p_data)
+            if self.decode_messages and isinstance(p_data, string_types):
+                self.decode_message(p_data)
+
+    def recv(self, timeout=None):
+        """Returns the next received message (requires the `receive_queue` option),
+           must not be called from transport callbacks.
+
+        :param timeout: seconds to wait (or `None` to wait indefinitely)
+        :type timeout: float
+
+        :return: message
+        :raises ReceiveTimeout: no message was received within `timeout`
+        :raises ReceiveQueueClosed: the socket is closed and all messages have been received
+        """
+        if self.receive_queue is None:
+            raise Exception('Receive queue not enabled')
+
+        return self.receive_queue.get(timeout=timeout)
+
+    def messages(self):
+        """Iterates over received messages until the socket is closed
+           (requires the `receive_queue` option)."""
+        while True:
+            try:
+                yield self.recv()
+            except ReceiveQueueClosed:
                 return
 
-        else:
-            log.debug('packet received with socket ready_state "%s"', self.ready_state)
+    def decode_message(self, data):
+        """Decodes a JSON message once for every `decodedMessage` listener."""
+        try:
+            decoded = self.codec.loads(data)
+        except ValueError as exc:
+            log.debug('unable to decode message: %s', exc)
+            self.emit('decodeError', data, exc)
+            return
+
+        self.emit('decodedMessage', decoded)
 
     def on_handshake(self, data):
         """Called upon handshake completion."""
         self.emit('handshake', data)
 
+        if self.capability_cache:
+            self.capability_cache.record_handshake(
+                self.capability_key,
+                (monotonic() - self.opened_at) * 1000,
+                self.transport.name,
+                self.transport.supports_binary
+            )
+
         self.sid = data.get('sid')
         self.transport.query['sid'] = self.sid
 
@@ -311,28 +721,40 @@ class Socket(Emitter):
         self.on_open()
         self.set_ping()
 
-        # Prolong liveness of socket on heartbeat
-        self.off('heartbeat', self.on_heartbeat)
-        self.on('heartbeat', self.on_heartbeat)
+        # Start liveness tracking, prolonged by every received packet
+        self.on_heartbeat()
 
+    @serialized
     def on_heartbeat(self, timeout=None):
         """Resets ping timeout."""
-        if self.ping_timeout_timer:
-            self.ping_timeout_timer.cancel()
+        self.heartbeat_at = monotonic()
+        self.heartbeat_timeout = timeout or self.ping_interval + self.ping_timeout
+
+        if self.ping_timeout_timer and self.ping_timeout_timer.active:
+            # push the existing deadline back instead of creating a new timer
+            self.ping_timeout_timer.reset(self.heartbeat_timeout / 1000.0)
+            return
 
         def timer_callback():
             if self.ready_state == 'closed':
                 return
 
-            self.on_close('ping timeout')
+            if self.last_seen is not None and self.last_seen > self.heartbeat_at:
+                # packets received since the deadline was set, measure from the last one
+                self.heartbeat_at = self.last_seen
+                self.heartbeat_timeout = self.ping_interval + self.ping_timeout
+
+            remaining = self.heartbeat_at + self.heartbeat_timeout / 1000.0 - monotonic()
 
-        if not timeout:
-            timeout = self.ping_interval + self.ping_timeout
+            if remaining > 0:
+                self.ping_timeout_timer.reset(remaining)
+                return
+
+            self.on_close('ping timeout')
 
-        log.debug("ping_timeout_timer updated, timeout: %s" % timeout)
+        log.debug("ping_timeout_timer updated, timeout: %s", self.heartbeat_timeout)
 
-        self.ping_timeout_timer = Timer(timeout / 1000, timer_callback)
-        self.ping_timeout_timer.start()
+        self.ping_timeout_timer = self.scheduler.schedule(self.heartbeat_timeout / 1000.0, self.serial(timer_callback))
 
     def set_ping(self):
         """Pings server every `self.ping_interval` and expects response
@@ -341,59 +763,162 @@ class Socket(Emitter):
             self.ping_interval_timer.cancel()
 
         def timer_callback():
-            log.debug('writing ping packet - expecting pong within %sms', self.ping_timeout)
+            timeout = self.pong_timeout()
+
+            log.debug('writing ping packet - expecting pong within %sms', timeout)
             self.ping()
-            self.on_heartbeat(self.ping_timeout)
+            self.on_heartbeat(timeout)
 
-        log.debug("ping_interval_timer updated, interval: %s" % self.ping_interval)
+        log.debug("ping_interval_timer updated, interval: %s", self.ping_interval)
 
-        self.ping_interval_timer = Timer(self.ping_interval / 1000, timer_callback)
-        self.ping_interval_timer.start()
+        self.ping_interval_timer = self.scheduler.schedule(self.ping_interval / 1000.0, timer_callback)
 
     def ping(self):
         """Sends a ping packet."""
+        self.ping_sent_at = monotonic()
         self.send_packet('ping')
 
+    def on_pong(self, elapsed):
+        """Records the round-trip time of the last ping.
+
+        :param elapsed: seconds since the ping was written
+        :type elapsed: float
+        """
+        self.ping_sent_at = None
+        self.rtt_estimator.update(elapsed * 1000)
+
+        if self.metrics:
+            self.metrics.observe('ping_rtt_seconds', elapsed)
+
+        self.emit('rtt', self.rtt_estimator.last)
+
+    def pong_timeout(self):
+        """Returns the time (in ms) a pong is expected within after a ping.
+
+        :rtype: float
+        """
+        if not self.adaptive_ping_timeout:
+            return self.ping_timeout
+
+        timeout = self.rtt_estimator.timeout()
+
+        if timeout is None:
+            return self.ping_timeout
+
+        return min(self.ping_timeout, max(self.min_pong_timeout, timeout))
+
+    @property
+    def rtt(self):
+        """Smoothed ping round-trip time (in ms), `None` until a pong is received.
+
+        :rtype: float
+        """
+        return self.rtt_estimator.smoothed
+
+    @property
+    def rtt_jitter(self):
+        """Ping round-trip time variation (in ms), `None` until a pong is received.
+
+        :rtype: float
+        """
+        return self.rtt_estimator.jitter
+
+    @serialized
     def on_drain(self):
         """Called on `drain` event"""
-        for x in range(self.prev_buffer_len):
-            if not self.callback_buffer[x]:
+        # clearing the in flight batch is very important
+        # for example, when upgrading, upgrade packet is sent over,
+        # and a stale batch could cause problems on `drain`
+        for callback in self.write_buffer.acknowledge():
+            if not callback:
                 continue
 
-            self.callback_buffer[x]()
+            callback()
 
-        self.write_buffer = self.write_buffer[self.prev_buffer_len:]
-        self.callback_buffer = self.callback_buffer[self.prev_buffer_len:]
-
-        # setting prevBufferLen = 0 is very important
-        # for example, when upgrading, upgrade packet is sent over,
-        # and a nonzero prevBufferLen could cause problems on `drain`
-        self.prev_buffer_len = 0
+        self.update_buffer_state()
 
         if not self.write_buffer:
             self.emit('drain')
         else:
-            self.flush()
+            self.flush(force=True)
+
+    @serialized
+    def flush(self, force=False):
+        """Flush write buffers.
+
+        :param force: flush immediately, ignoring the coalescing window
+        :type force: bool
+        """
+        if self.flushing == get_ident():
+            # called within `transport.send()`, flushed again once it returns
+            self.flush_pending = force or bool(self.flush_pending)
+            return
+
+        self.flushing = get_ident()
+
+        try:
+            self.flush_batch(force)
+
+            while self.flush_pending is not None:
+                force, self.flush_pending = self.flush_pending, None
+
+                self.flush_batch(force)
+        finally:
+            self.flushing = None
+            self.flush_pending = None
 
-    def flush(self):
-        """Flush write buffers."""
-        if self.ready_state == 'closed' or self.upgrading:
+    def flush_batch(self, force):
+        """Sends the next batch of the write buffer (if the socket and transport are writable)."""
+        if self.ready_state == 'closed' or self.upgrading or self.racers or self.batching:
             return
 
         if not self.transport.writable or not self.write_buffer:
             return
 
-        # keep track of current length of writeBuffer
-        # splice writeBuffer and callbackBuffer on `drain`
-        self.prev_buffer_len = len(self.write_buffer)
+        if not force and self.should_coalesce():
+            if not (self.coalesce_timer and self.coalesce_timer.active):
+                self.coalesce_timer = self.scheduler.schedule(
+                    self.coalesce_delay / 1000.0,
+                    lambda: self.flush(force=True)
+                )
 
-        log.debug('flushing %d packets in socket', len(self.write_buffer))
-        self.transport.send(self.write_buffer)
+            return
+
+        if self.coalesce_timer:
+            self.coalesce_timer.cancel()
+            self.coalesce_timer = None
+
+        if self.metrics:
+            self.metrics.observe('write_buffer_packets', len(self.write_buffer))
+
+        # batch stays in the buffer until acknowledged on `drain`
+        packets = self.write_buffer.take_batch()
+
+        if self.metrics:
+            self.metrics.observe('flush_batch_packets', len(packets))
+
+        log.debug('flushing %d packets in socket', len(packets))
+        self.transport.send(packets)
 
         self.emit('flush')
 
+    def should_coalesce(self):
+        """Checks if the flush should be delayed to coalesce polling writes.
+
+        :rtype: bool
+        """
+        if not self.coalesce_delay or self.transport.name != 'polling':
+            return False
+
+        if self.coalesce_size is not None and self.write_buffer.bytes >= self.coalesce_size:
+            return False
+
+        return True
+
+    @serialized
     def write(self, message, callback=None):
-        """Sends a message.
+        """Sends a message, check `buffer_high` (or use `wait_writable()`)
+           to respect backpressure.
 
         :param message: message
         :type message: str
@@ -404,6 +929,55 @@ class Socket(Emitter):
         self.send_packet('message', message, callback)
         return self
 
+    @serialized
+    def write_many(self, messages, callback=None):
+        """Sends multiple messages with a single flush.
+
+        :param messages: messages
+        :type messages: list
+
+        :param callback: called once every message has been written (or dropped)
+        :type callback: function
+        """
+        messages = list(messages)
+        written = not messages
+
+        with self.batch():
+            for message in messages:
+                self.send_packet('message', message)
+
+            # completed by a marker, messages can be dropped or replaced by the buffer policy
+            if callback and messages:
+                written = not self.write_buffer.add_marker(callback)
+
+        if written:
+            callback()
+
+        return self
+
+    @contextmanager
+    def batch(self):
+        """Defers flushing until the block exits, so packets sent within
+           the block are written together."""
+        self.begin_batch()
+
+        try:
+            yield self
+        finally:
+            self.end_batch()
+
+    @serialized
+    def begin_batch(self):
+        self.batching += 1
+
+    @serialized
+    def end_batch(self):
+        self.batching -= 1
+
+        if not self.batching:
+            self.flush(force=True)
+
+    @serialized
     def send_packet(self, p_type, data=None, callback=None):
         """Sends a packet.
 
@@ -419,13 +993,127 @@ class Socket(Emitter):
         packet = {'type': p_type, 'data': data}
         self.emit('packetCreate', packet)
 
-        self.write_buffer.append(packet)
-        self.callback_buffer.append(callback)
+        key = None
+
+        if p_type == 'message' and self.coalesce_key:
+            key = self.coalesce_key(data)
+
+        if p_type == 'message' and self.buffer_exceeds(self.high_water_packets, self.high_water_bytes):
+            if not self.apply_buffer_policy(packet, callback, key):
+                return
+
+        self.write_buffer.append(packet, callback, key)
 
         self.flush()
+        self.update_buffer_state()
+
+    def buffer_exceeds(self, packets, size):
+        """Checks if the write buffer is over the given limits.
+
+        :param packets: packet limit (or `None`)
+        :type packets: int
 
+        :param size: byte limit (or `None`)
+        :type size: int
+
+        :rtype: bool
+        """
+        if packets is not None and len(self.write_buffer) > packets:
+            return True
+
+        if size is not None and self.write_buffer.bytes > size:
+            return True
+
+        return False
+
+    def apply_buffer_policy(self, packet, callback, key=None):
+        """Applies coalescing and `buffer_policy` to a message written above
+           the high watermark, only unsent packets are replaced or dropped.
+
+        :param key: coalescing key of the message (or `None`)
+
+        :rtype: bool
+        :return: `True` if the packet should be buffered
+        """
+        if key is not None:
+            entry = self.write_buffer.find(key)
+
+            if entry is not None:
+                self.write_buffer.replace(entry, packet, callback)
+                return False
+
+        if self.buffer_policy == 'drop_new':
+            self.drop_packet(packet)
+            return False
+
+        if self.buffer_policy == 'drop_oldest':
+            for index, (queued, _, _) in self.write_buffer.unsent():
+                if queued['type'] != 'message':
+                    continue
+
+                self.drop_packet(self.write_buffer.remove(index))
+                break
+
+        return True
+
+    def drop_packet(self, packet):
+        log.debug('write buffer full - dropping packet')
+
+        self.dropped_packets += 1
+
+        if self.metrics:
+            self.metrics.increment('packets_dropped')
+
+        self.emit('packetDrop', packet)
+
+    def update_buffer_state(self):
+        """Updates the backpressure state after the write buffer changed."""
+        if not self.buffer_high:
+            if self.buffer_exceeds(self.high_water_packets, self.high_water_bytes):
+                self.buffer_high = True
+                self.buffer_writable.clear()
+
+                self.emit('bufferHigh')
+
+            return
+
+        if self.buffer_exceeds(self.low_water_packets, self.low_water_bytes):
+            return
+
+        self.buffer_high = False
+        self.buffer_writable.set()
+
+        self.emit('bufferLow')
+
+    def wait_writable(self, timeout=None):
+        """Blocks until the write buffer is back down to the low watermarks,
+           must not be called from transport callbacks.
+
+        :param timeout: seconds to wait (or `None` to wait indefinitely)
+        :type timeout: float
+
+        :rtype: bool
+        :return: `True` if the socket is writable
+        """
+        return self.buffer_writable.wait(timeout)
+
+    @serialized
     def close(self):
         """Closes the connection"""
+        if self.reconnect_timer:
+            log.debug('socket closed - cancelling reconnect')
+
+            self.reconnect_timer.cancel()
+            self.reconnect_timer = None
+
+            self.reconnect_attempt = 0
+            self.write_buffer = OutgoingQueue(self.max_batch)
+
+            self.update_buffer_state()
+
+            if self.receive_queue is not None:
+                self.receive_queue.close()
+
         if self.ready_state not in ['open', 'opening']:
             return self
 
@@ -436,15 +1124,20 @@ class Socket(Emitter):
 
         return self
 
+    @serialized
     def on_error(self, message):
         """Called upon transport error"""
         log.debug('socket error %s', message)
         Socket.prior_websocket_success = False
 
+        if self.capability_cache and self.transport.name == 'websocket':
+            self.capability_cache.update(self.capability_key, websocket=False)
+
         self.emit('error', message)
 
         self.on_close('transport error  %s' % message)
 
+    @serialized
     def on_close(self, reason=None, desc=None):
         """Called upon transport close"""
         if self.ready_state not in ['opening', 'open']:
@@ -464,6 +1157,20 @@ class Socket(Emitter):
 
         self.ping_timeout_timer = None
 
+        # Clear write coalescing timer
+        if self.coalesce_timer:
+            self.coalesce_timer.cancel()
+
+        self.coalesce_timer = None
+
+        # abort a transport race in progress
+        if self.racers:
+            racers, self.racers = self.racers, None
+
+            for transport in racers:
+                if transport is not self.transport:
+                    self.discard_transport(transport)
+
         # stop event from firing again for transport
         self.transport.off('close')
 
@@ -479,14 +1186,74 @@ class Socket(Emitter):
         # clear session id
         self.sid = None
 
+        if self.pool:
+            self.pool.unregister(self)
+
         # emit close event
         self.emit('close', reason, desc)
 
+        if self.should_reconnect(reason):
+            # keep unsent messages (and the unacknowledged batch) for replay
+            for callback in self.write_buffer.requeue():
+                if callback:
+                    callback()
+
+            self.schedule_reconnect()
+            return
+
         # clean buffers after the `close` emit, so developers
         # can still grab the buffers
-        self.write_buffer = []
-        self.callback_buffer = []
-        self.prev_buffer_len = 0
+        self.write_buffer = OutgoingQueue(self.max_batch)
+
+        # release writers waiting on backpressure
+        self.update_buffer_state()
+
+        # stop consumers once queued messages have been received
+        if self.receive_queue is not None:
+            self.receive_queue.close()
+
+    def should_reconnect(self, reason):
+        """Checks if the socket should reconnect after closing with `reason`.
+
+        :rtype: bool
+        """
+        if not self.reconnect or reason == 'forced close':
+            return False
+
+        if self.reconnect_attempts is not None and self.reconnect_attempt >= self.reconnect_attempts:
+            log.debug('giving up after %d reconnect attempt(s)', self.reconnect_attempt)
+
+            self.emit('reconnectFailed', self.reconnect_attempt)
+            self.reconnect_attempt = 0
+            return False
+
+        return True
+
+    def schedule_reconnect(self):
+        """Schedules the next reconnect attempt."""
+        delay = min(self.reconnect_delay * 2 ** self.reconnect_attempt, self.reconnect_delay_max)
+        delay *= 1 + self.reconnect_jitter * (2 * random.random() - 1)
+
+        self.reconnect_attempt += 1
+
+        @self.serial
+        def timer_callback():
+            self.reconnect_timer = None
+
+            if self.ready_state != 'closed':
+                return
+
+            log.debug('reconnect attempt %d', self.reconnect_attempt)
+
+            if self.pool:
+                self.pool.register(self)
+
+            self.open()
+
+        log.debug('reconnecting in %dms (attempt %d)', delay, self.reconnect_attempt)
+        self.emit('reconnecting', self.reconnect_attempt, delay)
+
+        self.reconnect_timer = self.scheduler.schedule(delay / 1000.0, timer_callback)
 
     def filter_upgrades(self, upgrades):
         """Filters upgrades, returning only those matching client transports.
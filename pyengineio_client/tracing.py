@@ -0,0 +1,52 @@
+from pyengineio_client.util import monotonic
+
+
+class Span(object):
+    __slots__ = ('tracer', 'name', 'attrs', 'started')
+
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+        self.started = monotonic()
+
+    def finish(self, **attrs):
+        """Ends the span, `attrs` are merged into the span attributes."""
+        if attrs:
+            self.attrs.update(attrs)
+
+        self.tracer.exit(self, monotonic() - self.started)
+
+
+class Tracer(object):
+    def __init__(self, on_enter=None, on_exit=None):
+        """Hooks called around hot-path operations ("encode", "send", "poll",
+           "decode" and "dispatch").
+
+        Pass a `Tracer` as the `tracer` socket option to enable tracing, with
+        no tracer configured each hook point is a single attribute check.
+
+        :param on_enter: called with `(name, attrs)` when a span starts
+        :type on_enter: function
+
+        :param on_exit: called with `(name, attrs, duration)` when a span ends
+        :type on_exit: function
+        """
+        self.on_enter = on_enter
+        self.on_exit = on_exit
+
+    def span(self, name, **attrs):
+        """Starts a span, call `finish()` on the result to end it.
+
+        :type name: str
+        :rtype: Span
+        """
+        if self.on_enter:
+            self.on_enter(name, attrs)
+
+        return Span(self, name, attrs)
+
+    def exit(self, span, duration):
+        if self.on_exit:
+            self.on_exit(span.name, span.attrs, duration)
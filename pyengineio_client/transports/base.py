@@ -1,12 +1,14 @@
+from pyengineio_client.compat import quote
+from pyengineio_client.emitter import FastEmitter
 from pyengineio_client.exceptions import TransportError
-from pyengineio_client.util import qs_encode
+from pyengineio_client.payload import decode_packet_view
+from pyengineio_client.util import packet_size, qs_encode
 
-from pyemitter import Emitter
 import pyengineio_parser as parser
 import time
 
 
-class Transport(Emitter):
+class Transport(FastEmitter):
     name = None
 
     protocol = None
@@ -22,16 +24,28 @@ class Transport(Emitter):
         self.query = opts['query']
 
         self.supports_binary = not (opts and opts.get('force_base64'))
+        self.binary_views = opts.get('binary_views', False)
 
         self.timestamp_param = opts['timestamp_param']
         self.timestamp_requests = opts['timestamp_requests']
 
         self.agent = opts['agent'] or False
+        self.pool = opts.get('pool')
         self.socket = opts['socket']
 
+        # metrics recorder (or `None` if instrumentation is disabled)
+        self.metrics = opts.get('metrics')
+
+        # tracing hooks (or `None` if tracing is disabled)
+        self.tracer = opts.get('tracer')
+
         self.ready_state = ''
         self.writable = False
 
+        # static part of the request uri (built once per session)
+        self.uri_base = None
+        self.uri_sid = None
+
     def on_error(self, message, desc=None):
         """Emits an error.
 
@@ -67,13 +81,27 @@ class Transport(Emitter):
     def do_close(self):
         raise NotImplementedError()
 
+    def release(self):
+        """Called once the transport is no longer used (closed, or replaced
+           by an upgrade), transports holding resources free them here."""
+        pass
+
     def send(self, packets):
         """Sends multiple packets.
 
         :type packets: list
         """
         if self.ready_state == 'open':
-            self.write(packets)
+            span = self.tracer.span('send', transport=self.name, packets=len(packets)) if self.tracer else None
+
+            if self.metrics:
+                self.record_packets('sent', packets)
+
+            try:
+                self.write(packets)
+            finally:
+                if span:
+                    span.finish()
         else:
             raise Exception('Transport not open')
 
@@ -91,33 +119,78 @@ class Transport(Emitter):
 
         :type data: str
         """
-        self.on_packet(parser.decode_packet(data))
+        span = self.tracer.span('decode', transport=self.name) if self.tracer else None
+        packet = None
+
+        try:
+            if isinstance(data, memoryview):
+                packet = decode_packet_view(data)
+            else:
+                packet = parser.decode_packet(data)
+        finally:
+            if span:
+                span.finish(type=packet.get('type') if packet else None)
+
+        self.on_packet(packet)
 
     def on_packet(self, packet):
         """Called with a decoded packet."""
+        if self.metrics:
+            self.record_packets('received', [packet])
+
         self.emit('packet', packet)
 
+    def record_packets(self, direction, packets):
+        """Records packet and byte counters for `direction` ('sent' or 'received')."""
+        for packet in packets:
+            self.metrics.increment('packets_%s' % direction, type=packet.get('type'), transport=self.name)
+            self.metrics.increment('bytes_%s' % direction, packet_size(packet), transport=self.name)
+
     def on_close(self):
         """Called upon close."""
         self.ready_state = 'closed'
         self.emit('close', 'transport closed')
 
     def uri(self):
-        query = self.query or {}
+        """Returns the request uri, only the timestamp is generated per request.
+
+        :rtype: str
+        """
+        sid = self.query.get('sid') if self.query else None
+
+        if self.uri_base is None or sid != self.uri_sid:
+            self.uri_base = self.build_uri_base()
+            self.uri_sid = sid
+
+        if not self.timestamp_requests:
+            return self.uri_base
+
+        timestamp = Transport.timestamps
+        Transport.timestamps += 1
+
+        return '%s%s-%s' % (self.uri_base, time.time(), timestamp)
+
+    def build_uri_base(self):
+        """Builds the request uri (ending with the timestamp parameter if enabled).
+
+        :rtype: str
+        """
+        query = dict(self.query or {})
+        query.pop(self.timestamp_param, None)
+
         protocol = self.uri_protocol
         port = self.uri_port
 
-        # add timestamp to query (if enabled)
-        if self.timestamp_requests:
-            query[self.timestamp_param] = '%s-%s' % (time.time(), Transport.timestamps)
-            Transport.timestamps += 1
-
         # communicate binary support capabilities
         if not self.supports_binary:
             query['b64'] = 1
 
         query = qs_encode(query)
 
+        # timestamp value is appended per request (if enabled)
+        if self.timestamp_requests:
+            query += '%s%s=' % ('&' if query else '', quote(self.timestamp_param))
+
         # prepend ? to query
         if len(query):
             query = '?' + query
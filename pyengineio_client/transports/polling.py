@@ -1,4 +1,5 @@
 from .base import Transport
+from pyengineio_client.payload import decode_payload_view, is_binary_payload
 
 from threading import Semaphore
 import pyengineio_parser as parser
@@ -13,6 +14,9 @@ class Polling(Transport):
     protocol = 'http'
     protocol_secure = 'https'
 
+    # size of chunks read from streamed poll responses
+    stream_chunk_size = 8192
+
     def __init__(self, opts):
         """Polling interface.
 
@@ -21,6 +25,14 @@ class Polling(Transport):
         super(Polling, self).__init__(opts)
 
         self.polling = False
+        self.poll_span = None
+
+        # decode poll responses while they are received
+        self.stream_polls = opts.get('stream_polls', False)
+
+        # write counters (packets per request = packets_written / writes)
+        self.writes = 0
+        self.packets_written = 0
 
     def do_open(self):
         """Opens the socket (triggers polling). We write a PING message to determine
@@ -72,6 +84,10 @@ class Polling(Transport):
         """Starts polling cycle."""
         log.debug('polling')
         self.polling = True
+
+        if self.tracer:
+            self.poll_span = self.tracer.span('poll', transport=self.name)
+
         self.do_poll()
         self.emit('poll')
 
@@ -80,23 +96,46 @@ class Polling(Transport):
 
     def on_data(self, data):
         """Overloads onData to detect payloads."""
-        log.debug('polling got data %s', repr(data))
+        log.debug('polling got data %r', data)
+
+        span = self.tracer.span('decode', transport=self.name) if self.tracer else None
 
         def callback(packet, index, total):
-            # if its the first message we consider the transport open
-            if self.ready_state == 'opening':
-                self.on_open()
+            self.on_payload_packet(packet)
 
-            # if its a close packet, we close the ongoing requests
-            if packet['type'] == 'close':
-                self.on_close()
-                return
+        # decode payload
+        try:
+            if not isinstance(data, memoryview):
+                parser.decode_payload(data, callback)
+            elif is_binary_payload(data):
+                decode_payload_view(data, callback)
+            else:
+                parser.decode_payload(bytearray(data), callback)
+        finally:
+            if span:
+                span.finish()
 
-            # otherwise bypass onData and handle the message
-            self.on_packet(packet)
+        self.on_poll_complete()
 
-        # decode payload
-        parser.decode_payload(data, callback)
+    def on_payload_packet(self, packet):
+        """Called with each packet decoded from a payload."""
+        # if its the first message we consider the transport open
+        if self.ready_state == 'opening':
+            self.on_open()
+
+        # if its a close packet, we close the ongoing requests
+        if packet['type'] == 'close':
+            self.on_close()
+            return
+
+        # otherwise bypass onData and handle the message
+        self.on_packet(packet)
+
+    def on_poll_complete(self):
+        """Called once a poll response has been fully decoded."""
+        if self.poll_span:
+            self.poll_span.finish()
+            self.poll_span = None
 
         # if an event did not trigger closing
         if self.ready_state != 'closed':
@@ -127,11 +166,39 @@ class Polling(Transport):
     def write(self, packets):
         self.writable = False
 
+        self.writes += 1
+        self.packets_written += len(packets)
+
         def write_callback(data):
             self.writable = True
             self.emit('drain')
 
+        if self.tracer:
+            span = self.tracer.span('encode', transport=self.name, packets=len(packets))
+            encoded = []
+
+            try:
+                parser.encode_payload(packets, encoded.append, self.supports_binary)
+            finally:
+                span.finish()
+
+            for data in encoded:
+                self.do_write(data, write_callback)
+
+            return
+
         parser.encode_payload(packets, lambda data: self.do_write(data, write_callback), self.supports_binary)
 
     def do_write(self, data, callback):
         raise NotImplementedError()
+
+    @property
+    def packets_per_write(self):
+        """Average number of packets sent per write request.
+
+        :rtype: float
+        """
+        if not self.writes:
+            return 0.0
+
+        return float(self.packets_written) / self.writes
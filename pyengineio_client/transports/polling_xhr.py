@@ -1,7 +1,13 @@
 from .polling import Polling
+from pyengineio_client.compat import IncompleteRead
+from pyengineio_client.payload import PayloadDecoder
+from pyengineio_client.util import monotonic
 
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
 from requests_futures.sessions import FuturesSession
-from httplib import IncompleteRead
+from threading import Lock
 import logging
 
 log = logging.getLogger(__name__)
@@ -11,31 +17,139 @@ class XHR_Polling(Polling):
     def __init__(self, opts):
         super(XHR_Polling, self).__init__(opts)
 
-        self.supports_binary = True
+        if self.pool:
+            # share the pool sessions (and their connections) when pooled
+            self.poll_session = self.pool.poll_session
+            self.write_session = self.pool.write_session
+        else:
+            # dedicated keep-alive connections for the long-poll and writes,
+            # so a write never waits behind a poll (or a connection setup)
+            self.poll_session = self.create_session()
+            self.write_session = self.create_session()
+
+        # requests in flight, dedicated sessions are closed once the transport
+        # is released and these have completed (e.g. the close packet POST)
+        self.pending = 0
+        self.pending_lock = Lock()
+
+        self.released = False
+        self.sessions_closed = False
+
+    @staticmethod
+    def create_session():
+        """Creates a session holding a single persistent connection.
+
+        :rtype: requests_futures.sessions.FuturesSession
+        """
+        session = FuturesSession(max_workers=1)
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+        return session
+
+    @property
+    def connection_stats(self):
+        """Request and connection counters for the poll and write channels,
+           `requests` greater than `connections` means connections are being reused.
+
+        :rtype: dict
+        """
+        stats = {}
 
-        self.session = FuturesSession()
+        for name, session in [('poll', self.poll_session), ('write', self.write_session)]:
+            manager = session.get_adapter('%s://' % self.uri_protocol).poolmanager
+            pools = [manager.pools[key] for key in manager.pools.keys()]
 
-    def request(self, data=None, method='GET', callback=None):
-        future = None
+            stats[name] = {
+                'requests': sum([pool.num_requests for pool in pools]),
+                'connections': sum([pool.num_connections for pool in pools])
+            }
+
+        return stats
+
+    def release(self):
+        if self.pool:
+            return
+
+        with self.pending_lock:
+            self.released = True
+            idle = not self.pending
+
+        if idle:
+            self.close_sessions()
+
+    def close_sessions(self):
+        """Closes the dedicated sessions, their connections and worker threads."""
+        with self.pending_lock:
+            if self.sessions_closed:
+                return
+
+            self.sessions_closed = True
+
+        log.debug('closing sessions')
+
+        for session in [self.poll_session, self.write_session]:
+            # may run on the session's own worker, so don't wait for it to exit
+            session.executor.shutdown(wait=False)
+            Session.close(session)
+
+    def on_close(self):
+        super(XHR_Polling, self).on_close()
+
+        self.release()
+
+    def request(self, data=None, method='GET', callback=None, stream=False):
+        if method not in ['GET', 'POST']:
+            self.on_error('Unknown method specified')
+            return
+
+        with self.pending_lock:
+            if self.sessions_closed:
+                log.debug('sessions closed - ignoring %s request', method)
+                return
+
+            self.pending += 1
+
+        started = monotonic() if self.metrics else None
 
         if method == 'GET':
-            future = self.session.get(self.uri())
-        elif method == 'POST':
-            future = self.session.post(
+            future = self.poll_session.get(self.uri(), stream=stream)
+        else:
+            future = self.write_session.post(
                 self.uri(), data,
 
                 # Important for binary requests
                 headers={'Content-Type': 'application/octet-stream'}
             )
-        else:
-            self.on_error('Unknown method specified')
 
         def on_response(future):
+            try:
+                handle_response(future)
+            finally:
+                self.request_complete()
+
+        def handle_response(future):
+            if future.cancelled():
+                # session was shut down
+                return
+
+            if started is not None:
+                # streamed polls are timed until the response headers arrive
+                self.metrics.observe(
+                    'poll_seconds' if method == 'GET' else 'write_seconds',
+                    monotonic() - started, transport=self.name
+                )
+
             exc = future.exception()
 
             if exc:
-                if type(exc.message) is IncompleteRead:
-                    self.on_error(exc.message.partial)
+                message = getattr(exc, 'message', None)
+
+                if type(message) is IncompleteRead:
+                    self.on_error(message.partial)
                 else:
                     self.on_error(str(exc))
 
@@ -47,11 +161,26 @@ class XHR_Polling(Polling):
                 self.on_error('request returned with status code %s' % response.status_code)
                 return
 
-            if callback:
+            if not callback:
+                return
+
+            if stream:
+                callback(response)
+            elif self.binary_views:
+                callback(memoryview(response.content))
+            else:
                 callback(bytearray(response.content))
 
         future.add_done_callback(on_response)
 
+    def request_complete(self):
+        with self.pending_lock:
+            self.pending -= 1
+            idle = self.released and not self.pending
+
+        if idle:
+            self.close_sessions()
+
     def do_write(self, data, callback):
         """Sends data.
 
@@ -69,4 +198,27 @@ class XHR_Polling(Polling):
 
     def do_poll(self):
         log.debug('xhr poll')
-        self.request(callback=self.on_data)
+
+        if self.stream_polls:
+            self.request(callback=self.on_stream, stream=True)
+        else:
+            self.request(callback=self.on_data)
+
+    def on_stream(self, response):
+        """Decodes a streamed poll response, dispatching packets as they arrive."""
+        decoder = PayloadDecoder(self.on_payload_packet)
+
+        try:
+            for chunk in response.iter_content(self.stream_chunk_size):
+                decoder.feed(chunk)
+
+                if self.ready_state == 'closed':
+                    response.close()
+                    return
+        except RequestException as exc:
+            self.on_error(str(exc))
+            return
+
+        decoder.close()
+
+        self.on_poll_complete()
@@ -1,4 +1,7 @@
 from .base import Transport
+from pyengineio_client.compat import PY2
+from pyengineio_client.deflate import PerMessageDeflate
+from pyengineio_client.reactor import get_reactor
 
 from threading import Thread
 import pyengineio_parser as parser
@@ -23,11 +26,28 @@ class WebSocket(Transport):
         """
         super(WebSocket, self).__init__(opts)
 
+        # shared reactor servicing this connection (if any)
+        self.reactor = opts.get('reactor')
+        self.connection = None
+
+        # permessage-deflate options (`True` for defaults, or `PerMessageDeflate` arguments)
+        self.compression = opts.get('compression')
+
+        # codec for the connection (set if the server accepted compression)
+        self.deflate = None
+
         self.thread = None
         self.ws = None
 
     def do_open(self):
         """Opens socket."""
+        if self.compression and not self.reactor:
+            # compressed frames are read by the reactor
+            self.reactor = get_reactor()
+
+        if self.reactor:
+            self.reactor.open(self)
+            return
 
         self.ws = websocket.WebSocketApp(
             self.uri(),
@@ -35,13 +55,36 @@ class WebSocket(Transport):
             on_open=lambda ws: self.on_open(),
             on_message=lambda ws, data: self.on_data(data),
             on_error=lambda ws, e: self.on_error(e),
-            on_close=lambda ws: self.on_close()
+            on_close=lambda ws, *args: self.on_close()
         )
 
         self.thread = Thread(target=self.ws.run_forever)
         self.thread.start()
 
+    def create_deflate(self):
+        """Creates the permessage-deflate codec offered during the handshake.
+
+        :rtype: pyengineio_client.deflate.PerMessageDeflate
+        """
+        if not self.compression:
+            return None
+
+        options = self.compression if isinstance(self.compression, dict) else {}
+
+        return PerMessageDeflate(metrics=self.metrics, **options)
+
+    @property
+    def compression_stats(self):
+        """Raw and compressed byte counters (or `None` if compression isn't enabled).
+
+        :rtype: dict
+        """
+        return self.deflate.stats if self.deflate else None
+
     def do_close(self):
+        if self.connection:
+            self.connection.close()
+
         if self.ws:
             self.ws.close()
 
@@ -50,9 +93,24 @@ class WebSocket(Transport):
 
         # encodePacket efficient as it uses WS framing
         # no need for encodePayload
-        for packet in packets:
-            parser.encode_packet(packet, self.ws.send, self.supports_binary)
+        send = self.connection.send if self.connection else self.send_frame
+
+        span = self.tracer.span('encode', transport=self.name, packets=len(packets)) if self.tracer else None
+
+        try:
+            for packet in packets:
+                parser.encode_packet(packet, send, self.supports_binary)
+        finally:
+            if span:
+                span.finish()
 
         # fake drain
         self.writable = True
         self.emit('drain')
+
+    def send_frame(self, data):
+        """Sends an encoded packet as a text or binary frame."""
+        if isinstance(data, bytearray) or (not PY2 and isinstance(data, bytes)):
+            self.ws.send(bytes(data), websocket.ABNF.OPCODE_BINARY)
+        else:
+            self.ws.send(data)
@@ -1,4 +1,5 @@
-from urlparse import urlparse
+from pyengineio_client.compat import urlparse
+
 import re
 
 
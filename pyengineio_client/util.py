@@ -1,4 +1,9 @@
-import urllib
+from pyengineio_client.compat import quote, unquote
+
+import time
+
+# clock unaffected by system time changes (where available)
+monotonic = getattr(time, 'monotonic', time.time)
 
 
 def qs_encode(d):
@@ -8,7 +13,7 @@ def qs_encode(d):
         if result:
             result += '&'
 
-        result += urllib.quote(key) + '=' + urllib.quote(d[key])
+        result += quote(key) + '=' + quote(str(value))
 
     return result
 
@@ -21,8 +26,29 @@ def qs_decode(qs):
         if not pair:
             continue
 
-        value = urllib.unquote(pair[1]) if len(pair) == 2 else None
+        value = unquote(pair[1]) if len(pair) == 2 else None
 
-        qry[urllib.unquote(pair[0])] = value
+        qry[unquote(pair[0])] = value
 
     return qry
+
+
+def half(value):
+    """Returns half of `value`, or `None` if no value is provided."""
+    if value is None:
+        return None
+
+    return value // 2
+
+
+def packet_size(packet):
+    """Returns the size of the packet data (in bytes or characters)."""
+    data = packet.get('data')
+
+    if data is None:
+        return 0
+
+    try:
+        return len(data)
+    except TypeError:
+        return len(str(data))
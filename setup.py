@@ -9,7 +9,7 @@ setup(
     author_email='me@dgardiner.net',
 
     description='Client for engine.io',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     platforms='any',
 
     install_requires=[
@@ -21,6 +21,11 @@ setup(
         'websocket-client'
     ],
 
+    extras_require={
+        'asyncio': ['aiohttp'],
+        'json': ['orjson']
+    },
+
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
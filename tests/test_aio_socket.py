@@ -0,0 +1,84 @@
+from pyengineio_client.aio.socket import AsyncSocket
+
+import asyncio
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class FakeResponse(object):
+    def __init__(self, method):
+        self.method = method
+        self.status = 200
+
+    async def __aenter__(self):
+        if self.method == 'GET':
+            # long-poll, answered once the close packet is written
+            await asyncio.sleep(0.05)
+
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def read(self):
+        return b'ok' if self.method == 'POST' else b'1:6'
+
+
+class FakeSession(object):
+    created = []
+
+    def __init__(self):
+        self.closed = False
+        self.methods = []
+
+        FakeSession.created.append(self)
+
+    def request(self, method, url, **kwargs):
+        if self.closed:
+            raise RuntimeError('Session is closed')
+
+        self.methods.append(method)
+        return FakeResponse(method)
+
+    async def close(self):
+        self.closed = True
+
+
+class AsyncSocketTestCase(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        FakeSession.created = []
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_close_releases_session(self):
+        with mock.patch('aiohttp.ClientSession', FakeSession):
+            socket = AsyncSocket('http://localhost/', {
+                'loop': self.loop,
+                'transports': ['polling'],
+                'upgrade': False
+            })
+
+            socket.transport.on_open()
+            socket.on_handshake({'sid': 'abc', 'upgrades': [], 'pingInterval': 25000, 'pingTimeout': 5000})
+
+            socket.close()
+
+            self.loop.run_until_complete(asyncio.sleep(0.2))
+
+        # the close packet is written with the socket session, which is closed afterwards
+        self.assertEqual(len(FakeSession.created), 1)
+
+        session = FakeSession.created[0]
+
+        self.assertIn('POST', session.methods)
+        self.assertTrue(session.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()